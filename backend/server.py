@@ -1,4 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -6,20 +7,39 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, AfterValidator, BeforeValidator, TypeAdapter, ValidationError
+import pydantic_core
+from typing import Annotated, Generic, List, Optional, Tuple, TypeVar, Union, get_args
 import uuid
-from datetime import datetime, timezone
+import base64
+import copy
+import time
+import asyncio
+import csv
+import io
+import hashlib
+import json
+import multiprocessing
+import re
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 import bcrypt
 import jwt
-from bson import ObjectId
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING, DeleteOne, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+import numpy as np
+from PIL import Image, ImageOps
+from pymongo.errors import BulkWriteError
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -34,6 +54,50 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
+# ==================== DATE HELPERS ====================
+# visit_date, attempt_date and intervention_date are stored as BSON dates (UTC).
+# Clients send and receive strings: bare dates ("2024-05-01") from the forms or
+# full ISO timestamps. Midnight UTC values are returned as bare dates again.
+def to_bson_date(value) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).strip())
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def from_bson_date(value):
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    if value.hour == value.minute == value.second == value.microsecond == 0:
+        return value.date().isoformat()
+    return value.isoformat()
+
+def validate_date_string(value: str) -> str:
+    try:
+        to_bson_date(value)
+    except ValueError:
+        raise ValueError("must be an ISO 8601 date or timestamp")
+    return value
+
+def day_range(start_date: str, end_date: str) -> dict:
+    """Inclusive day range as a half-open datetime query"""
+    try:
+        start = to_bson_date(start_date)
+        end = to_bson_date(end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    return {"$gte": start, "$lt": end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)}
+
+DateInput = Annotated[str, AfterValidator(validate_date_string)]
+DateString = Annotated[str, BeforeValidator(from_bson_date)]
+
 # ==================== AUTH MODELS ====================
 class NurseRegister(BaseModel):
     email: EmailStr
@@ -114,9 +178,12 @@ class PatientResponse(BaseModel):
     created_at: str
     updated_at: str
     last_vitals: Optional[dict] = None
-    last_vitals_date: Optional[str] = None
-    last_visit_date: Optional[str] = None
+    last_vitals_date: Optional[DateString] = None
+    last_visit_id: Optional[str] = None
+    last_visit_date: Optional[DateString] = None
     last_utc: Optional[dict] = None  # last unable to contact record
+    next_due_date: Optional[DateString] = None  # From visit_frequency; None unless compliance_state is scheduled
+    compliance_state: Optional[str] = None  # scheduled, paused, inactive, unscheduled
     is_assigned_to_me: bool = False  # Computed field for current user
 
 # ==================== VISIT MODELS ====================
@@ -227,18 +294,18 @@ class HomeVisitLogbook(BaseModel):
     notes: Optional[str] = None
 
 class VisitCreate(BaseModel):
-    visit_date: Optional[str] = None
+    visit_date: Optional[DateInput] = None
     visit_type: str = "nurse_visit"  # nurse_visit, vitals_only, daily_note
     organization: Optional[str] = None  # POSH-Able Living, Ebenezer Private Home Care
-    vital_signs: VitalSigns = VitalSigns()
-    physical_assessment: PhysicalAssessment = PhysicalAssessment()
-    head_to_toe: HeadToToeAssessment = HeadToToeAssessment()
-    gastrointestinal: GastrointestinalAssessment = GastrointestinalAssessment()
-    genito_urinary: GenitoUrinaryAssessment = GenitoUrinaryAssessment()
-    respiratory: RespiratoryAssessment = RespiratoryAssessment()
-    endocrine: EndocrineAssessment = EndocrineAssessment()
-    changes_since_last: ChangesSinceLastVisit = ChangesSinceLastVisit()
-    home_visit_logbook: HomeVisitLogbook = HomeVisitLogbook()
+    vital_signs: VitalSigns = Field(default_factory=VitalSigns)
+    physical_assessment: PhysicalAssessment = Field(default_factory=PhysicalAssessment)
+    head_to_toe: HeadToToeAssessment = Field(default_factory=HeadToToeAssessment)
+    gastrointestinal: GastrointestinalAssessment = Field(default_factory=GastrointestinalAssessment)
+    genito_urinary: GenitoUrinaryAssessment = Field(default_factory=GenitoUrinaryAssessment)
+    respiratory: RespiratoryAssessment = Field(default_factory=RespiratoryAssessment)
+    endocrine: EndocrineAssessment = Field(default_factory=EndocrineAssessment)
+    changes_since_last: ChangesSinceLastVisit = Field(default_factory=ChangesSinceLastVisit)
+    home_visit_logbook: HomeVisitLogbook = Field(default_factory=HomeVisitLogbook)
     overall_health_status: Optional[str] = None  # stable, unstable, deteriorating, needs immediate attention
     nurse_notes: Optional[str] = None
     daily_note_content: Optional[str] = None  # For daily notes
@@ -251,18 +318,20 @@ class VisitResponse(BaseModel):
     id: str
     patient_id: str
     nurse_id: str
-    visit_date: str
+    visit_date: DateString
     visit_type: str = "nurse_visit"
     organization: Optional[str] = None
-    vital_signs: VitalSigns
-    physical_assessment: PhysicalAssessment
-    head_to_toe: HeadToToeAssessment
-    gastrointestinal: GastrointestinalAssessment
-    genito_urinary: GenitoUrinaryAssessment
-    respiratory: RespiratoryAssessment
-    endocrine: EndocrineAssessment
-    changes_since_last: ChangesSinceLastVisit
-    home_visit_logbook: HomeVisitLogbook = HomeVisitLogbook()
+    # Visits are stored sparse; sections and fields left out of the document rehydrate to their defaults.
+    # Factories rather than shared instances: pydantic deep-copies instance defaults on every validation.
+    vital_signs: VitalSigns = Field(default_factory=VitalSigns)
+    physical_assessment: PhysicalAssessment = Field(default_factory=PhysicalAssessment)
+    head_to_toe: HeadToToeAssessment = Field(default_factory=HeadToToeAssessment)
+    gastrointestinal: GastrointestinalAssessment = Field(default_factory=GastrointestinalAssessment)
+    genito_urinary: GenitoUrinaryAssessment = Field(default_factory=GenitoUrinaryAssessment)
+    respiratory: RespiratoryAssessment = Field(default_factory=RespiratoryAssessment)
+    endocrine: EndocrineAssessment = Field(default_factory=EndocrineAssessment)
+    changes_since_last: ChangesSinceLastVisit = Field(default_factory=ChangesSinceLastVisit)
+    home_visit_logbook: HomeVisitLogbook = Field(default_factory=HomeVisitLogbook)
     overall_health_status: Optional[str] = None
     nurse_notes: Optional[str] = None
     daily_note_content: Optional[str] = None
@@ -270,8 +339,45 @@ class VisitResponse(BaseModel):
     attachments: List[str] = []
     screening_completed_by: Optional[str] = None
     reviewed_and_signed_by: Optional[str] = None
+    version: int = 0  # Incremented on every write; send it back with PATCH
     created_at: str
 
+# Nested assessment sections of a visit document and the model for each
+VISIT_SECTIONS = [
+    ("vital_signs", VitalSigns),
+    ("physical_assessment", PhysicalAssessment),
+    ("head_to_toe", HeadToToeAssessment),
+    ("gastrointestinal", GastrointestinalAssessment),
+    ("genito_urinary", GenitoUrinaryAssessment),
+    ("respiratory", RespiratoryAssessment),
+    ("endocrine", EndocrineAssessment),
+    ("changes_since_last", ChangesSinceLastVisit),
+    ("home_visit_logbook", HomeVisitLogbook),
+]
+
+class VisitPatch(BaseModel):
+    """Partial visit update: only the fields and section keys that are sent are written"""
+    version: int  # Version the client last read; a mismatch is rejected with 409
+    visit_date: Optional[DateInput] = None
+    visit_type: Optional[str] = None
+    organization: Optional[str] = None
+    vital_signs: Optional[VitalSigns] = None
+    physical_assessment: Optional[PhysicalAssessment] = None
+    head_to_toe: Optional[HeadToToeAssessment] = None
+    gastrointestinal: Optional[GastrointestinalAssessment] = None
+    genito_urinary: Optional[GenitoUrinaryAssessment] = None
+    respiratory: Optional[RespiratoryAssessment] = None
+    endocrine: Optional[EndocrineAssessment] = None
+    changes_since_last: Optional[ChangesSinceLastVisit] = None
+    home_visit_logbook: Optional[HomeVisitLogbook] = None
+    overall_health_status: Optional[str] = None
+    nurse_notes: Optional[str] = None
+    daily_note_content: Optional[str] = None
+    status: Optional[str] = None
+    attachments: Optional[List[str]] = None
+    screening_completed_by: Optional[str] = None
+    reviewed_and_signed_by: Optional[str] = None
+
 # ==================== INTERVENTION MODELS ====================
 class InjectionDetails(BaseModel):
     is_vaccination: bool = False
@@ -310,7 +416,7 @@ class ProcedureDetails(BaseModel):
 
 class InterventionCreate(BaseModel):
     patient_id: str
-    intervention_date: str
+    intervention_date: DateInput
     location: str  # home, adult_day_center
     body_temperature: Optional[str] = None
     mood_scale: Optional[int] = None  # 1-5
@@ -346,7 +452,7 @@ class InterventionResponse(BaseModel):
     patient_name: Optional[str] = None
     patient_dob: Optional[str] = None
     nurse_id: str
-    intervention_date: str
+    intervention_date: DateString
     location: str
     body_temperature: Optional[str] = None
     mood_scale: Optional[int] = None
@@ -376,7 +482,7 @@ class InterventionResponse(BaseModel):
 class UnableToContactCreate(BaseModel):
     patient_id: str
     visit_type: str  # nurse_visit, vitals_only, daily_note - prefilled reason
-    attempt_date: str
+    attempt_date: DateInput
     attempt_time: Optional[str] = None
     attempt_reason: Optional[str] = None  # NEW: routine_nurse_visit, patient_intervention, vitals_only, other
     attempt_location: str  # home, day_program, telephone, virtual, other
@@ -403,7 +509,7 @@ class UnableToContactResponse(BaseModel):
     patient_name: Optional[str] = None
     nurse_id: str
     visit_type: str
-    attempt_date: str
+    attempt_date: DateString
     attempt_time: Optional[str] = None
     attempt_reason: Optional[str] = None  # NEW
     attempt_location: str
@@ -453,13 +559,404 @@ class DayProgramResponse(BaseModel):
     contact_person: Optional[str] = None
     created_at: str
 
+# ==================== PAGINATION ====================
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to fetch the next page
+
+def encode_cursor(sort_value, doc_id: str) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps([sort_value, doc_id]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[object, str]:
+    try:
+        sort_value, doc_id = json_util.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return sort_value, doc_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_page(collection, query: dict, sort_field: str, direction: int, limit: int,
+                     cursor: Optional[str] = None, projection: Optional[dict] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Keyset pagination over (sort_field, id). Only limit + 1 documents are read
+    per request, no matter how large the underlying result set is.
+    """
+    if cursor:
+        sort_value, doc_id = decode_cursor(cursor)
+        op = "$lt" if direction == DESCENDING else "$gt"
+        query = {"$and": [query, {"$or": [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, "id": {op: doc_id}}
+        ]}]}
+    docs = await collection.find(query, projection or {"_id": 0}) \
+        .sort([(sort_field, direction), ("id", direction)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get(sort_field), docs[-1]["id"])
+    return docs, next_cursor
+
+# ==================== FAST RESPONSES ====================
+# When an endpoint returns model instances, FastAPI dumps them, validates the
+# result against response_model a second time and encodes it with the stdlib
+# json module. Returning a Response skips all of that, so the hot read paths
+# validate stored documents once here and encode with pydantic-core's JSON
+# serializer. Keep response_model on those routes for the OpenAPI schema.
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return pydantic_core.to_json(content)
+
+@lru_cache(maxsize=None)
+def response_adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+def typed_response(response_type, content, status_code: int = 200) -> Response:
+    """Validate content against response_type once and return it pre-encoded"""
+    adapter = response_adapter(response_type)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(content)),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+# ==================== INDEXES ====================
+# Every collection is keyed by its string "id"; the remaining indexes follow
+# the filter/sort shapes used by the endpoints below.
+INDEX_MANIFEST = {
+    "nurses": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        IndexModel([("full_name", ASCENDING), ("id", ASCENDING)], name="full_name_id"),
+    ],
+    "patients": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("full_name", ASCENDING), ("id", ASCENDING)], name="full_name_id"),
+        IndexModel([("nurse_id", ASCENDING)], name="nurse_id"),
+        IndexModel([("assigned_nurses", ASCENDING)], name="assigned_nurses"),
+        IndexModel([("permanent_info.organization", ASCENDING)], name="organization"),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+        IndexModel([("next_due_date", ASCENDING), ("id", ASCENDING)], name="next_due_date_id"),
+        IndexModel([("assigned_nurses", ASCENDING), ("next_due_date", ASCENDING), ("id", ASCENDING)], name="assigned_nurses_next_due_date_id"),
+        IndexModel([("permanent_info.organization", ASCENDING), ("next_due_date", ASCENDING), ("id", ASCENDING)], name="organization_next_due_date_id"),
+        IndexModel([("search.grams", ASCENDING)], name="search_grams"),
+        IndexModel([("search.tokens", ASCENDING)], name="search_tokens"),
+        IndexModel([("search.variants", ASCENDING)], name="search_variants"),
+        IndexModel([("permanent_info.date_of_birth", ASCENDING)], name="date_of_birth"),
+        IndexModel([("clinical_terms", ASCENDING), ("permanent_info.organization", ASCENDING), ("full_name", ASCENDING)], name="clinical_terms_organization_full_name"),
+    ],
+    "visits": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("patient_id", ASCENDING), ("visit_date", DESCENDING), ("id", DESCENDING)], name="patient_visit_date_id"),
+        IndexModel([("patient_id", ASCENDING), ("status", ASCENDING), ("visit_date", DESCENDING)], name="patient_status_visit_date"),
+        IndexModel([("nurse_id", ASCENDING), ("visit_date", ASCENDING)], name="nurse_visit_date"),
+        IndexModel([("visit_date", ASCENDING), ("id", ASCENDING)], name="visit_date_id"),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+        IndexModel(
+            [("nurse_id", ASCENDING), ("client_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"client_id": {"$exists": True}},
+            name="nurse_client_id_unique"
+        ),
+    ],
+    "deleted_records": [
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    "vitals_series": [
+        IndexModel([("visit_id", ASCENDING)], unique=True, name="visit_id_unique"),
+        IndexModel([("patient_id", ASCENDING), ("visit_date", ASCENDING)], name="patient_visit_date"),
+    ],
+    "vitals_alerts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("patient_name", ASCENDING), ("id", ASCENDING)], name="patient_name_id"),
+        IndexModel([("organization", ASCENDING), ("patient_name", ASCENDING), ("id", ASCENDING)], name="organization_patient_name_id"),
+        IndexModel([("alerts", ASCENDING)], name="alerts"),
+    ],
+    # GridFS layout, so standard GridFS tools can read finished attachments
+    "attachments.files": [
+        IndexModel([("metadata.nurse_id", ASCENDING), ("uploadDate", DESCENDING)], name="nurse_upload_date"),
+    ],
+    "attachments.chunks": [
+        IndexModel([("files_id", ASCENDING), ("n", ASCENDING)], unique=True, name="files_id_n_unique"),
+    ],
+    "monthly_rollups": [
+        IndexModel([("nurse_id", ASCENDING), ("month", ASCENDING), ("organization", ASCENDING), ("visit_type", ASCENDING)], unique=True, name="nurse_month_org_type"),
+    ],
+    "unable_to_contact": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING)], name="patient_created_at"),
+        IndexModel([("patient_id", ASCENDING), ("attempt_date", DESCENDING), ("id", DESCENDING)], name="patient_attempt_date_id"),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    "interventions": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("patient_id", ASCENDING), ("intervention_date", DESCENDING), ("id", DESCENDING)], name="patient_intervention_date_id"),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    "incident_reports": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("nurse_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="nurse_created_at_id"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    ],
+    "organizations": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "clinical_notes": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("fields.text", "text")], default_language="english", name="fields_text"),
+        IndexModel([("patient_ids", ASCENDING), ("note_date", DESCENDING)], name="patient_ids_note_date"),
+        IndexModel([("organization", ASCENDING), ("note_date", DESCENDING)], name="organization_note_date"),
+    ],
+    "day_programs": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+}
+
+async def ensure_indexes():
+    """Create every index in INDEX_MANIFEST. create_indexes is a no-op for existing indexes."""
+    for collection, indexes in INDEX_MANIFEST.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except Exception as e:
+            logger.error(f"Failed to create indexes on {collection}: {e}")
+
+def query_shapes() -> List[tuple]:
+    """
+    Representative (endpoint, collection, filter, sort) shapes issued by the
+    endpoints. Shapes whose filter comes from a builder are built with it, so
+    they cannot drift from what the endpoints send. Each one must be answered
+    by an index; verify_query_plans() reports any that fall back to COLLSCAN.
+    """
+    nurse = {"id": "x", "assigned_patients": ["x"], "assigned_organizations": ["x"]}
+    admin = {"id": "x", "is_admin": True}
+    search, _, _ = patient_search_query(search_terms("jhon"), [], ["x"])
+    search_prefix, _, _ = patient_search_query(["j"], [], None)
+    search_date_of_birth, _, _ = patient_search_query([], ["1952-11-08"], None)
+    return [
+        ("get_current_nurse", "nurses", {"id": "x"}, None),
+        ("login", "nurses", {"email": "x@example.com"}, None),
+        ("list_all_nurses", "nurses", {}, [("full_name", 1), ("id", 1)]),
+        ("accessible_patient_ids", "patients", accessible_patient_query(nurse), None),
+        ("require_patient_access", "patients", {"id": {"$in": ["x"]}, **accessible_patient_query(nurse)}, None),
+        ("require_patient_access.admin", "patients", {"id": {"$in": ["x"]}, **accessible_patient_query(admin)}, None),
+        ("list_patients", "patients", {}, [("full_name", 1), ("id", 1)]),
+        ("get_patient", "patients", {"id": "x"}, None),
+        ("list_visits", "visits", {"patient_id": "x"}, [("visit_date", -1), ("id", -1)]),
+        ("get_visit", "visits", {"id": "x", "nurse_id": "x"}, None),
+        ("get_last_visit", "visits", completed_visits_query("x"), [("visit_date", -1)]),
+        ("get_visit_prefill", "visits", completed_visits_query("x"), LAST_VISIT_SORT),
+        ("activity_summary.last_visit", "visits", {"patient_id": "x", "status": "completed", "visit_type": {"$ne": "daily_note"}}, [("visit_date", -1)]),
+        ("activity_summary.last_utc", "unable_to_contact", {"patient_id": "x"}, [("created_at", -1)]),
+        ("list_unable_to_contact", "unable_to_contact", {"patient_id": "x"}, [("attempt_date", -1), ("id", -1)]),
+        ("get_unable_to_contact", "unable_to_contact", {"id": "x"}, None),
+        ("list_interventions", "interventions", {"patient_id": "x"}, [("intervention_date", -1), ("id", -1)]),
+        ("get_intervention", "interventions", {"id": "x", "nurse_id": "x"}, None),
+        ("list_incident_reports", "incident_reports", {"nurse_id": "x"}, [("created_at", -1), ("id", -1)]),
+        ("list_incident_reports.admin", "incident_reports", {}, [("created_at", -1), ("id", -1)]),
+        ("update_organization", "organizations", {"id": "x"}, None),
+        ("update_day_program", "day_programs", {"id": "x"}, None),
+        ("export_visits", "visits", {"visit_date": day_range("2024-01-01", "2024-12-31")}, [("visit_date", 1), ("id", 1)]),
+        ("sync_changes.visits", "visits", {"updated_at": {"$gt": "2024-01-01T00:00:00+00:00"}}, [("updated_at", 1), ("id", 1)]),
+        ("sync_changes.deleted", "deleted_records", {"updated_at": {"$gt": "2024-01-01T00:00:00+00:00"}}, [("updated_at", 1), ("id", 1)]),
+        ("monthly_report.rollups", "monthly_rollups", {"nurse_id": "x", "month": "2024-01"}, None),
+        ("vitals_trend", "vitals_series", {"patient_id": "x", "visit_date": day_range("2020-01-01", "2024-12-31")}, [("visit_date", 1)]),
+        ("list_vitals_alerts", "vitals_alerts", {"organization": "x"}, [("patient_name", 1), ("id", 1)]),
+        ("overdue_patients", "patients", {"next_due_date": {"$lt": datetime(2024, 1, 8, tzinfo=timezone.utc)}}, [("next_due_date", 1), ("id", 1)]),
+        ("overdue_patients.nurse", "patients", {"assigned_nurses": "x", "next_due_date": {"$lt": datetime(2024, 1, 8, tzinfo=timezone.utc)}}, [("next_due_date", 1), ("id", 1)]),
+        ("overdue_patients.organization", "patients", {"permanent_info.organization": "x", "next_due_date": {"$lt": datetime(2024, 1, 8, tzinfo=timezone.utc)}}, [("next_due_date", 1), ("id", 1)]),
+        ("search_patients", "patients", search, None),
+        ("search_patients.prefix", "patients", search_prefix, None),
+        ("search_patients.date_of_birth", "patients", search_date_of_birth, None),
+        ("search_notes", "clinical_notes", notes_search_query(nurse, ["x"], "chest pain"), None),
+        ("search_notes.admin", "clinical_notes", notes_search_query(admin, None, "chest pain", organization="x"), None),
+        ("clinical_term_patients", "patients", {"clinical_terms": "medication:metformin"}, [("full_name", 1)]),
+        ("clinical_term_patients.organization", "patients", {"clinical_terms": "allergy:latex", "permanent_info.organization": "x"}, [("full_name", 1)]),
+        ("monthly_report", "visits", {"nurse_id": "x", "visit_date": day_range("2024-01-01", "2024-01-31")}, [("visit_date", 1)]),
+    ]
+
+def _plan_stages(plan) -> List[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+async def verify_query_plans() -> List[dict]:
+    """Run explain() on every query_shapes() entry and report the winning plan stages"""
+    results = []
+    for name, collection, query, sort in query_shapes():
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        results.append({
+            "endpoint": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return results
+
+# ==================== CACHES ====================
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after ttl seconds"""
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every invalidation so a read that raced an invalidation is not cached
+        self.epoch = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, epoch: Optional[int] = None):
+        if epoch is not None and epoch != self.epoch:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self.epoch += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# A counter in db.meta that workers compare their cached entries against. Each
+# worker re-reads it at most every META_VERSION_TTL_SECONDS, so hot paths do not
+# pay a round trip per request; a bump on another worker is seen within that
+# interval, a bump on this worker immediately.
+META_VERSION_TTL_SECONDS = float(os.environ.get('META_VERSION_TTL_SECONDS', '1'))
+
+class SharedVersion:
+    def __init__(self, meta_id: str, ttl: float = META_VERSION_TTL_SECONDS):
+        self.meta_id = meta_id
+        self.ttl = ttl
+        self.value = None
+        self.expires = 0.0
+
+    async def current(self) -> int:
+        if self.value is None or self.expires < time.monotonic():
+            meta = await db.meta.find_one({"_id": self.meta_id}, {"version": 1})
+            self._store(meta["version"] if meta else 0)
+        return self.value
+
+    async def bump(self) -> int:
+        """Record a write; call after the write"""
+        meta = await db.meta.find_one_and_update(
+            {"_id": self.meta_id}, {"$inc": {"version": 1}},
+            projection={"version": 1}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._store(meta["version"])
+        return self.value
+
+    def _store(self, value: int):
+        # A read that started before a bump on this worker may finish after it
+        self.value = value if self.value is None else max(self.value, value)
+        self.expires = time.monotonic() + self.ttl
+
+    def stats(self) -> dict:
+        return {"meta_id": self.meta_id, "version": self.value, "ttl_seconds": self.ttl}
+
+# Authenticated nurse documents keyed by nurse id, each stored with the
+# principals version it was read under. Every write to a nurse's permissions
+# bumps principals_version, and get_current_nurse only uses an entry whose
+# version is still current, so no worker serves a demoted admin or a revoked
+# assignment for longer than META_VERSION_TTL_SECONDS.
+nurse_principal_cache = TTLCache(
+    maxsize=int(os.environ.get('NURSE_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('NURSE_CACHE_TTL_SECONDS', '30'))
+)
+
+# Carry-forward fields of each patient's last completed visit, keyed by patient
+# id ({} when there is none), each stored with the last_visit_version it was
+# read under. Every visit write bumps that version, so the prefill endpoint on
+# any worker is at most META_VERSION_TTL_SECONDS behind. Write-time carry-forward
+# does not use the cache at all.
+last_visit_cache = TTLCache(
+    maxsize=int(os.environ.get('LAST_VISIT_CACHE_SIZE', '2048')),
+    ttl=float(os.environ.get('LAST_VISIT_CACHE_TTL_SECONDS', '60'))
+)
+
+# Patient ids each nurse may work with, keyed by nurse id, each stored with the
+# principals and patient access versions it was read under. Only hits of a
+# current entry are trusted (see PATIENT ACCESS).
+patient_access_cache = TTLCache(
+    maxsize=int(os.environ.get('PATIENT_ACCESS_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('PATIENT_ACCESS_CACHE_TTL_SECONDS', '30'))
+)
+
 # ==================== AUTH HELPERS ====================
-def hash_password(password: str) -> str:
+# bcrypt takes 100-300 ms per call, so it runs on a dedicated, bounded pool
+# instead of the event loop. Once BCRYPT_MAX_PENDING calls are queued or running,
+# further requests are rejected with a fast 503 rather than piling up.
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', '4'))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', '32'))
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_pending = 0
+
+async def run_bcrypt(func, *args):
+    global _bcrypt_pending
+    if _bcrypt_pending >= BCRYPT_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"}
+        )
+    _bcrypt_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, func, *args)
+    finally:
+        _bcrypt_pending -= 1
+
+def _hash_password_sync(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
-def verify_password(password: str, hashed: str) -> bool:
+def _verify_password_sync(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def hash_password(password: str) -> str:
+    return await run_bcrypt(_hash_password_sync, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await run_bcrypt(_verify_password_sync, password, hashed)
+
 def create_token(nurse_id: str) -> str:
     payload = {
         "nurse_id": nurse_id,
@@ -467,6 +964,13 @@ def create_token(nurse_id: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+principals_version = SharedVersion("nurse_principals")
+
+async def bump_principals_version(nurse_id: str):
+    """Record a write to a nurse's permissions; call after the write"""
+    await principals_version.bump()
+    nurse_principal_cache.invalidate(nurse_id)
+
 async def get_current_nurse(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
@@ -474,15 +978,86 @@ async def get_current_nurse(credentials: HTTPAuthorizationCredentials = Depends(
         nurse_id = payload.get("nurse_id")
         if not nurse_id:
             raise HTTPException(status_code=401, detail="Invalid token")
-        nurse = await db.nurses.find_one({"id": nurse_id}, {"_id": 0})
-        if not nurse:
-            raise HTTPException(status_code=401, detail="Nurse not found")
-        return nurse
+        version = await principals_version.current()
+        cached = nurse_principal_cache.get(nurse_id)
+        if cached is not None and cached[0] == version:
+            nurse = cached[1]
+        else:
+            epoch = nurse_principal_cache.epoch
+            # Version is read before the document: an entry is never labelled
+            # newer than what it holds
+            nurse = await db.nurses.find_one({"id": nurse_id}, {"_id": 0, "password_hash": 0})
+            if not nurse:
+                raise HTTPException(status_code=401, detail="Nurse not found")
+            nurse_principal_cache.set(nurse_id, (version, nurse), epoch=epoch)
+        return dict(nurse)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# ==================== PATIENT ACCESS ====================
+# One resolver for every patient-scoped endpoint. A nurse can work with the
+# patients they created, the patients assigned to them (from either side) and
+# every patient of their assigned organizations; admins can work with all of
+# them. Each nurse's resolved id set is cached, tagged with the principals
+# version and patient_access_version. Writes that can revoke access (nurse
+# permissions; patient assignments, organization and deletion) bump one of
+# them, so no worker keeps granting a revoked patient for longer than
+# META_VERSION_TTL_SECONDS. Only a hit is trusted: creating a patient grants
+# access without a bump, so a miss is re-checked against the database before
+# answering 404.
+patient_access_version = SharedVersion("patient_access")
+
+async def access_versions() -> Tuple[int, int]:
+    return await principals_version.current(), await patient_access_version.current()
+
+def accessible_patient_query(nurse: dict) -> dict:
+    if nurse.get("is_admin"):
+        return {}
+    return {"$or": [
+        {"nurse_id": nurse["id"]},
+        {"assigned_nurses": nurse["id"]},
+        {"id": {"$in": nurse.get("assigned_patients", [])}},
+        {"permanent_info.organization": {"$in": nurse.get("assigned_organizations", [])}}
+    ]}
+
+async def accessible_patient_ids(nurse: dict) -> frozenset:
+    """Read the nurse's accessible ids from the database and refresh the cache. Not for admins."""
+    epoch = patient_access_cache.epoch
+    # Versions are read before the ids, so an entry is never labelled newer than what it holds
+    versions = await access_versions()
+    patient_ids = frozenset([
+        p["id"] async for p in db.patients.find(accessible_patient_query(nurse), {"_id": 0, "id": 1})
+    ])
+    patient_access_cache.set(nurse["id"], (versions, patient_ids), epoch=epoch)
+    return patient_ids
+
+async def accessible_subset(nurse: dict, patient_ids) -> set:
+    """The patient_ids that exist and that the nurse may work with"""
+    wanted = set(patient_ids)
+    allowed = set()
+    if not nurse.get("is_admin"):
+        cached = patient_access_cache.get(nurse["id"])
+        if cached is not None and cached[0] == await access_versions():
+            cached_ids = cached[1]
+        else:
+            cached_ids = await accessible_patient_ids(nurse)
+        allowed = wanted & cached_ids
+    missing = wanted - allowed
+    if missing:
+        found = await db.patients.distinct("id", {"id": {"$in": list(missing)}, **accessible_patient_query(nurse)})
+        if found and not nurse.get("is_admin"):
+            # Granted since the cached set was read
+            patient_access_cache.invalidate(nurse["id"])
+        allowed.update(found)
+    return allowed
+
+async def require_patient_access(nurse: dict, patient_id: str):
+    """404 unless the patient exists and the nurse may work with them"""
+    if patient_id not in await accessible_subset(nurse, [patient_id]):
+        raise HTTPException(status_code=404, detail="Patient not found")
+
 # ==================== AUTH ENDPOINTS ====================
 @api_router.post("/auth/register", response_model=TokenResponse)
 async def register(data: NurseRegister):
@@ -498,7 +1073,7 @@ async def register(data: NurseRegister):
     nurse_doc = {
         "id": nurse_id,
         "email": data.email,
-        "password_hash": hash_password(data.password),
+        "password_hash": await hash_password(data.password),
         "full_name": data.full_name,
         "title": data.title,
         "license_number": data.license_number,
@@ -531,7 +1106,7 @@ async def login(data: NurseLogin):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     logger.info(f"User found, verifying password")
-    password_valid = verify_password(data.password, nurse["password_hash"])
+    password_valid = await verify_password(data.password, nurse["password_hash"])
     logger.info(f"Password valid: {password_valid}")
     
     if not password_valid:
@@ -566,13 +1141,20 @@ async def get_me(nurse: dict = Depends(get_current_nurse)):
     )
 
 # ==================== ADMIN ENDPOINTS ====================
-@api_router.get("/admin/nurses", response_model=List[NurseListResponse])
-async def list_all_nurses(nurse: dict = Depends(get_current_nurse)):
+@api_router.get("/admin/nurses", response_model=Page[NurseListResponse])
+async def list_all_nurses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
     if not nurse.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    nurses = await db.nurses.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    return [NurseListResponse(**n) for n in nurses]
+    nurses, next_cursor = await fetch_page(
+        db.nurses, {}, "full_name", ASCENDING, limit, cursor,
+        projection={"_id": 0, "password_hash": 0}
+    )
+    return typed_response(Page[NurseListResponse], {"items": nurses, "next_cursor": next_cursor})
 
 @api_router.post("/admin/nurses/{nurse_id}/promote")
 async def promote_to_admin(nurse_id: str, nurse: dict = Depends(get_current_nurse)):
@@ -580,6 +1162,7 @@ async def promote_to_admin(nurse_id: str, nurse: dict = Depends(get_current_nurs
         raise HTTPException(status_code=403, detail="Admin access required")
     
     result = await db.nurses.update_one({"id": nurse_id}, {"$set": {"is_admin": True}})
+    await bump_principals_version(nurse_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Nurse not found")
     return {"message": "Nurse promoted to admin"}
@@ -594,6 +1177,7 @@ async def demote_from_admin(nurse_id: str, nurse: dict = Depends(get_current_nur
         raise HTTPException(status_code=400, detail="Cannot demote yourself")
     
     result = await db.nurses.update_one({"id": nurse_id}, {"$set": {"is_admin": False}})
+    await bump_principals_version(nurse_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Nurse not found")
     return {"message": "Admin privileges removed"}
@@ -619,6 +1203,7 @@ async def update_nurse(nurse_id: str, data: NurseUpdateRequest, nurse: dict = De
         raise HTTPException(status_code=400, detail="No data to update")
     
     result = await db.nurses.update_one({"id": nurse_id}, {"$set": update_data})
+    await bump_principals_version(nurse_id)
     return {"message": "Nurse updated successfully"}
 
 class NurseAssignmentRequest(BaseModel):
@@ -644,6 +1229,7 @@ async def update_nurse_assignments(nurse_id: str, data: NurseAssignmentRequest,
             "allowed_forms": data.allowed_forms
         }}
     )
+    await bump_principals_version(nurse_id)
     return {"message": "Assignments updated successfully"}
 
 @api_router.post("/admin/patients/{patient_id}/assign")
@@ -653,19 +1239,95 @@ async def assign_nurses_to_patient(patient_id: str, nurse_ids: List[str], nurse:
     
     result = await db.patients.update_one(
         {"id": patient_id},
-        {"$set": {"assigned_nurses": nurse_ids}}
+        {"$set": {"assigned_nurses": nurse_ids, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Patient not found")
+    await patient_access_version.bump()
     return {"message": "Nurses assigned successfully"}
 
+@api_router.get("/admin/diagnostics/query-plans")
+async def get_query_plans(nurse: dict = Depends(get_current_nurse)):
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    results = await verify_query_plans()
+    return {
+        "ok": not any(r["collscan"] for r in results),
+        "plans": results
+    }
+
+@api_router.get("/admin/diagnostics/cache-stats")
+async def get_cache_stats(nurse: dict = Depends(get_current_nurse)):
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {
+        "nurse_principals": nurse_principal_cache.stats(),
+        "last_visits": last_visit_cache.stats(),
+        "last_visit_version": last_visit_version.stats(),
+        "patient_access": patient_access_cache.stats(),
+        "principals_version": principals_version.stats(),
+        "patient_access_version": patient_access_version.stats()
+    }
+
+# ==================== REFERENCE DATA ====================
+# Organizations and day programs change a few times a year but are listed on
+# most screens. Each worker keeps an in-memory snapshot of both, pre-encoded,
+# tagged with the version stored in meta {"_id": "reference_data"}. Every write
+# bumps that version, so a read that finds the stored version ahead of its
+# snapshot reloads, which keeps all uvicorn workers coherent. Responses carry
+# the version as an ETag and answer If-None-Match with 304.
+REFERENCE_DATA_META_ID = "reference_data"
+reference_snapshot = {"version": None}
+reference_lock = asyncio.Lock()
+
+async def reference_data_version() -> int:
+    meta = await db.meta.find_one({"_id": REFERENCE_DATA_META_ID}, {"version": 1})
+    return meta["version"] if meta else 0
+
+async def bump_reference_data_version():
+    """Record an organization/day program write and rebuild this worker's snapshot"""
+    await db.meta.update_one({"_id": REFERENCE_DATA_META_ID}, {"$inc": {"version": 1}}, upsert=True)
+    await get_reference_snapshot()
+
+async def get_reference_snapshot() -> dict:
+    version = await reference_data_version()
+    if reference_snapshot["version"] == version:
+        return reference_snapshot
+    async with reference_lock:
+        # Another request may have reloaded while this one waited
+        version = await reference_data_version()
+        if reference_snapshot["version"] != version:
+            # Version is read before the data, so a snapshot is never labelled
+            # newer than what it holds; a concurrent write just forces one more reload
+            organizations = await db.organizations.find({}, {"_id": 0}).to_list(None)
+            day_programs = await db.day_programs.find({}, {"_id": 0}).to_list(None)
+            reference_snapshot.update(
+                version=version,
+                organizations=organizations,
+                day_programs=day_programs,
+                organizations_json=response_adapter(List[OrganizationResponse]).dump_json(
+                    response_adapter(List[OrganizationResponse]).validate_python(organizations)
+                ),
+                day_programs_json=response_adapter(List[DayProgramResponse]).dump_json(
+                    response_adapter(List[DayProgramResponse]).validate_python(day_programs)
+                )
+            )
+    return reference_snapshot
+
+def reference_response(request: Request, snapshot: dict, kind: str) -> Response:
+    etag = f'"{kind}-{snapshot["version"]}"'
+    # no-cache: the browser must revalidate, and gets a 304 while nothing changed
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot[f"{kind}_json"], media_type="application/json", headers=headers)
+
 # ==================== ORGANIZATIONS ====================
 @api_router.get("/admin/organizations", response_model=List[OrganizationResponse])
-async def list_organizations(nurse: dict = Depends(get_current_nurse)):
+async def list_organizations(request: Request, nurse: dict = Depends(get_current_nurse)):
     if not nurse.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
-    organizations = await db.organizations.find({}, {"_id": 0}).to_list(100)
-    return organizations
+    return reference_response(request, await get_reference_snapshot(), "organizations")
 
 @api_router.post("/admin/organizations", response_model=OrganizationResponse)
 async def create_organization(data: OrganizationCreate, nurse: dict = Depends(get_current_nurse)):
@@ -681,15 +1343,15 @@ async def create_organization(data: OrganizationCreate, nurse: dict = Depends(ge
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.organizations.insert_one(organization)
+    await bump_reference_data_version()
     return OrganizationResponse(**organization)
 
 # ==================== DAY PROGRAMS ====================
 @api_router.get("/admin/day-programs", response_model=List[DayProgramResponse])
-async def list_day_programs(nurse: dict = Depends(get_current_nurse)):
+async def list_day_programs(request: Request, nurse: dict = Depends(get_current_nurse)):
     if not nurse.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
-    programs = await db.day_programs.find({}, {"_id": 0}).to_list(100)
-    return programs
+    return reference_response(request, await get_reference_snapshot(), "day_programs")
 
 @api_router.post("/admin/day-programs", response_model=DayProgramResponse)
 async def create_day_program(data: DayProgramCreate, nurse: dict = Depends(get_current_nurse)):
@@ -705,6 +1367,7 @@ async def create_day_program(data: DayProgramCreate, nurse: dict = Depends(get_c
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.day_programs.insert_one(program)
+    await bump_reference_data_version()
     return DayProgramResponse(**program)
 
 @api_router.put("/admin/organizations/{org_id}", response_model=OrganizationResponse)
@@ -723,6 +1386,10 @@ async def update_organization(org_id: str, data: OrganizationCreate, nurse: dict
         "contact_phone": data.contact_phone
     }
     await db.organizations.update_one({"id": org_id}, {"$set": update_data})
+    await bump_reference_data_version()
+    if data.name != existing.get("name"):
+        patient_ids = [p["id"] async for p in db.patients.find({"permanent_info.organization": org_id}, {"_id": 0, "id": 1})]
+        await refresh_patient_search(patient_ids)
     return OrganizationResponse(**{**existing, **update_data})
 
 @api_router.put("/admin/day-programs/{program_id}", response_model=DayProgramResponse)
@@ -741,6 +1408,7 @@ async def update_day_program(program_id: str, data: DayProgramCreate, nurse: dic
         "contact_person": data.contact_person
     }
     await db.day_programs.update_one({"id": program_id}, {"$set": update_data})
+    await bump_reference_data_version()
     return DayProgramResponse(**{**existing, **update_data})
 
 @api_router.delete("/admin/organizations/{org_id}")
@@ -750,6 +1418,7 @@ async def delete_organization(org_id: str, nurse: dict = Depends(get_current_nur
     result = await db.organizations.delete_one({"id": org_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Organization not found")
+    await bump_reference_data_version()
     return {"message": "Organization deleted successfully"}
 
 @api_router.delete("/admin/day-programs/{program_id}")
@@ -759,6 +1428,7 @@ async def delete_day_program(program_id: str, nurse: dict = Depends(get_current_
     result = await db.day_programs.delete_one({"id": program_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Day program not found")
+    await bump_reference_data_version()
     return {"message": "Day program deleted successfully"}
 
 @api_router.post("/incident-reports")
@@ -770,17 +1440,646 @@ async def create_incident_report(data: dict, nurse: dict = Depends(get_current_n
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.incident_reports.insert_one(report)
+    await index_clinical_notes("incident_report", [report])
     return {"message": "Incident report created successfully", "id": report["id"]}
 
-@api_router.get("/incident-reports")
-async def list_incident_reports(nurse: dict = Depends(get_current_nurse)):
+@api_router.get("/incident-reports", response_model=Page[dict])
+async def list_incident_reports(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    # Regular staff can only see their own reports, admins can see all reports
+    query = {} if nurse.get("is_admin") else {"nurse_id": nurse["id"]}
+    reports, next_cursor = await fetch_page(db.incident_reports, query, "created_at", DESCENDING, limit, cursor)
+    return {"items": reports, "next_cursor": next_cursor}
+
+# ==================== VISIT COMPLIANCE ====================
+# permanent_info.visit_frequency sets how often a patient must be seen. Each
+# patient stores next_due_date (indexed) = last completed visit + interval,
+# pushed back by any hospitalization or temporary move recorded since that
+# visit. It is recomputed with the activity summary on every visit/UTC write.
+PAUSING_LOCATIONS = {"admitted", "moved_temporarily"}  # Pause the clock until expected_return_date
+ENDING_LOCATIONS = {"moved_permanently", "deceased"}  # No further visits are due
+VISIT_FREQUENCIES = {
+    "daily": (1, 0),
+    "weekly": (7, 0),
+    "bi-weekly": (14, 0),
+    "biweekly": (14, 0),
+    "every other week": (14, 0),
+    "semi-monthly": (15, 0),
+    "twice monthly": (15, 0),
+    "monthly": (0, 1),
+    "bi-monthly": (0, 2),
+    "every other month": (0, 2),
+    "quarterly": (0, 3),
+}
+EVERY_N_PATTERN = re.compile(r"^every\s+(\d+)\s+(day|week|month)s?$")
+
+def parse_visit_frequency(frequency: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(days, months) between visits, or None for "As needed" and unrecognised values"""
+    if not frequency:
+        return None
+    text = " ".join(frequency.strip().lower().split())
+    if text in VISIT_FREQUENCIES:
+        return VISIT_FREQUENCIES[text]
+    match = EVERY_N_PATTERN.match(text)
+    if match:
+        count, unit = int(match.group(1)), match.group(2)
+        return (0, count) if unit == "month" else (count * (7 if unit == "week" else 1), 0)
+    return None
+
+def add_interval(day: datetime, interval: Tuple[int, int]) -> datetime:
+    days, months = interval
+    if months:
+        month_index = day.month - 1 + months
+        year, month = day.year + month_index // 12, month_index % 12 + 1
+        # Clamp to the end of shorter months (Jan 31 + 1 month = Feb 28/29)
+        next_month = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+        day = day.replace(year=year, month=month, day=min(day.day, (next_month - timedelta(days=1)).day))
+    return day + timedelta(days=days)
+
+def start_of_day(value) -> datetime:
+    return to_bson_date(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def compute_next_due(frequency: Optional[str], anchor, absences: List[dict]) -> Tuple[Optional[datetime], str]:
+    """
+    (next_due_date, compliance_state) from the visit frequency, the last visit
+    (or creation) date and the patient's absence UTC records.
+    """
+    interval = parse_visit_frequency(frequency)
+    if interval is None or not anchor:
+        return None, "unscheduled"
+    try:
+        anchor = start_of_day(anchor)
+    except ValueError:
+        return None, "unscheduled"
+    
+    dated = []
+    for absence in absences:
+        try:
+            dated.append((start_of_day(absence["attempt_date"]), absence))
+        except (KeyError, ValueError):
+            continue
+    paused_days = 0
+    covered_until = anchor
+    for start, absence in sorted(dated, key=lambda item: item[0]):
+        if start < anchor:
+            continue
+        if absence["individual_location"] in ENDING_LOCATIONS:
+            return None, "inactive"
+        try:
+            end = start_of_day(absence["expected_return_date"]) if absence.get("expected_return_date") else None
+        except ValueError:
+            end = None
+        if end is None:
+            return None, "paused"
+        # Merge overlapping absences so shared days are only counted once
+        start = max(start, covered_until)
+        if end > start:
+            paused_days += (end - start).days
+            covered_until = end
+    return add_interval(anchor, interval) + timedelta(days=paused_days), "scheduled"
+
+class ComplianceEntry(BaseModel):
+    patient_id: str
+    full_name: str
+    organization: Optional[str] = None
+    visit_frequency: Optional[str] = None
+    last_visit_date: Optional[DateString] = None
+    next_due_date: DateString
+    days_overdue: int  # Negative while the visit is not yet due
+    status: str  # overdue, due_soon
+    assigned_nurses: List[str] = []
+
+@api_router.get("/compliance/due-visits", response_model=Page[ComplianceEntry])
+async def list_due_visits(
+    due_within_days: int = Query(7, ge=0, le=90),
+    organization: Optional[str] = None,
+    nurse_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Patients whose next visit is overdue or due within due_within_days, most
+    overdue first, optionally filtered by organization and/or assigned nurse.
+    Non-admins only see the patients they have access to; the filters narrow
+    that set.
+    """
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    query = {"next_due_date": {"$lt": today + timedelta(days=due_within_days + 1)}}
     if not nurse.get("is_admin"):
-        # Regular staff can only see their own reports
-        reports = await db.incident_reports.find({"nurse_id": nurse["id"]}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+        query["id"] = {"$in": list(await accessible_patient_ids(nurse))}
+    if nurse_id:
+        query["assigned_nurses"] = nurse_id
+    if organization:
+        query["permanent_info.organization"] = organization
+    
+    projection = {
+        "_id": 0, "id": 1, "full_name": 1, "assigned_nurses": 1, "next_due_date": 1,
+        "permanent_info.organization": 1, "permanent_info.visit_frequency": 1,
+        "activity_summary.last_visit_date": 1
+    }
+    patients, next_cursor = await fetch_page(db.patients, query, "next_due_date", ASCENDING, limit, cursor, projection)
+    items = []
+    for p in patients:
+        info = p.get("permanent_info") or {}
+        days_overdue = (today - p["next_due_date"]).days
+        items.append({
+            "patient_id": p["id"],
+            "full_name": p["full_name"],
+            "organization": info.get("organization"),
+            "visit_frequency": info.get("visit_frequency"),
+            "last_visit_date": (p.get("activity_summary") or {}).get("last_visit_date"),
+            "next_due_date": p["next_due_date"],
+            "days_overdue": days_overdue,
+            "status": "overdue" if days_overdue > 0 else "due_soon",
+            "assigned_nurses": p.get("assigned_nurses", [])
+        })
+    return typed_response(Page[ComplianceEntry], {"items": items, "next_cursor": next_cursor})
+
+# ==================== PATIENT ACTIVITY SUMMARY ====================
+# Labels shown on the dashboard for the most recent unable-to-contact record
+UTC_LOCATION_LABELS = {
+    "admitted": "Hospitalized",
+    "medical_appointment": "Medical Appt",
+    "overnight_family": "Overnight w/Family",
+    "outing": "Outing",
+    "moved_temporarily": "Temp Move",
+    "moved_permanently": "Perm Move",
+    "deceased": "Deceased",
+}
+
+def format_last_utc(record: Optional[dict]) -> Optional[dict]:
+    if not record:
+        return None
+    location = record.get("individual_location")
+    if location == "other":
+        reason = record.get("individual_location_other", "Other")
     else:
-        # Admins can see all reports
-        reports = await db.incident_reports.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return reports
+        reason = UTC_LOCATION_LABELS.get(location, "Unknown")
+    return {
+        "id": record.get("id"),
+        "date": from_bson_date(record.get("attempt_date")),
+        "reason": reason
+    }
+
+# Joins each patient with its last completed visit (daily notes and drafts are
+# not visits) and its most recent UTC record in a single round trip.
+PATIENT_ACTIVITY_LOOKUPS = [
+    {"$lookup": {
+        "from": "visits",
+        "localField": "id",
+        "foreignField": "patient_id",
+        "pipeline": [
+            {"$match": {"status": "completed", "visit_type": {"$ne": "daily_note"}}},
+            {"$sort": {"visit_date": -1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "id": 1, "visit_date": 1, "vital_signs": 1}}
+        ],
+        "as": "last_visit"
+    }},
+    {"$lookup": {
+        "from": "unable_to_contact",
+        "localField": "id",
+        "foreignField": "patient_id",
+        "pipeline": [
+            {"$sort": {"created_at": -1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "id": 1, "attempt_date": 1, "individual_location": 1, "individual_location_other": 1}}
+        ],
+        "as": "last_utc_record"
+    }},
+    {"$lookup": {
+        "from": "unable_to_contact",
+        "localField": "id",
+        "foreignField": "patient_id",
+        "pipeline": [
+            {"$match": {"individual_location": {"$in": sorted(PAUSING_LOCATIONS | ENDING_LOCATIONS)}}},
+            {"$sort": {"attempt_date": -1}},
+            {"$limit": 20},
+            {"$project": {"_id": 0, "attempt_date": 1, "expected_return_date": 1, "individual_location": 1}}
+        ],
+        "as": "absences"
+    }}
+]
+
+def build_activity_summary(last_visit: Optional[dict], last_utc: Optional[dict]) -> dict:
+    return {
+        "last_visit_id": last_visit.get("id") if last_visit else None,
+        "last_visit_date": last_visit.get("visit_date") if last_visit else None,
+        "last_vitals": VitalSigns(**(last_visit.get("vital_signs") or {})).model_dump() if last_visit else None,
+        "last_vitals_date": last_visit.get("visit_date") if last_visit else None,
+        "last_utc": format_last_utc(last_utc)
+    }
+
+async def refresh_activity_summaries(patient_ids: Optional[List[str]] = None, batch_size: int = 500) -> int:
+    """
+    Recompute the denormalized activity_summary and next visit due date for the
+    given patients (or all patients) from their visits and UTC records. Called
+    after every visit/UTC write, so deleting or demoting the latest record
+    falls back correctly.
+    """
+    match = {"id": {"$in": patient_ids}} if patient_ids is not None else {}
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "id": 1, "created_at": 1, "permanent_info.visit_frequency": 1}},
+        *PATIENT_ACTIVITY_LOOKUPS
+    ]
+    updated = 0
+    batch = []
+    
+    async def flush():
+        # Stamped per batch, right before the write: a full rebuild runs for
+        # minutes and must not commit updated_at values the sync feed has passed
+        now = datetime.now(timezone.utc).isoformat()
+        await db.patients.bulk_write(
+            [UpdateOne({"id": patient_id}, {"$set": {**fields, "updated_at": now}}) for patient_id, fields in batch],
+            ordered=False
+        )
+    
+    async for p in db.patients.aggregate(pipeline):
+        last_visit = p["last_visit"][0] if p.get("last_visit") else None
+        last_utc = p["last_utc_record"][0] if p.get("last_utc_record") else None
+        summary = build_activity_summary(last_visit, last_utc)
+        next_due_date, compliance_state = compute_next_due(
+            (p.get("permanent_info") or {}).get("visit_frequency"),
+            last_visit["visit_date"] if last_visit else p.get("created_at"),
+            p.get("absences", [])
+        )
+        batch.append((p["id"], {
+            "activity_summary": summary,
+            "last_vitals": summary["last_vitals"],
+            "next_due_date": next_due_date,
+            "compliance_state": compliance_state
+        }))
+        if len(batch) >= batch_size:
+            await flush()
+            updated += len(batch)
+            batch = []
+    if batch:
+        await flush()
+        updated += len(batch)
+    return updated
+
+def apply_activity_summary(patient: dict, nurse: dict) -> dict:
+    """Flatten the stored activity summary into PatientResponse fields"""
+    summary = patient.pop("activity_summary", None) or {}
+    patient["last_visit_id"] = summary.get("last_visit_id")
+    patient["last_visit_date"] = summary.get("last_visit_date")
+    patient["last_vitals"] = summary.get("last_vitals", patient.get("last_vitals"))
+    patient["last_vitals_date"] = summary.get("last_vitals_date")
+    patient["last_utc"] = summary.get("last_utc")
+    
+    # Check if current nurse is assigned
+    assigned_nurses = patient.get("assigned_nurses", [])
+    patient["is_assigned_to_me"] = nurse["id"] in assigned_nurses or nurse.get("is_admin", False)
+    patient["assigned_nurses"] = assigned_nurses
+    return patient
+
+@api_router.post("/admin/maintenance/rebuild-activity-summaries")
+async def rebuild_activity_summaries(nurse: dict = Depends(get_current_nurse)):
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    updated = await refresh_activity_summaries()
+    return {"message": "Activity summaries rebuilt", "patients_updated": updated}
+
+# ==================== PATIENT SEARCH ====================
+# Each patient carries a derived "search" subdocument: normalized name tokens,
+# tokens from the caregiver and organization names, padded trigrams of all of
+# them, and single-deletion variants of longer tokens. The multikey indexes on
+# search.grams, search.variants and search.tokens narrow the candidates; ranking
+# (exact > prefix > typo-tolerant) happens on that short list. Trigrams find
+# partially typed names; deletion variants find one-edit typos such as "jhon",
+# which shares no trigram with "john" but shares the variant "jon".
+SEARCH_CANDIDATES = 200  # Candidates ranked per query, by shared trigrams and variants
+SEARCH_VARIANT_MIN_LENGTH = 4  # Same threshold as one allowed edit in allowed_edits
+SEARCH_MIN_TERM_SCORE = 0.5  # Every query term has to match at least this well
+SEARCH_OTHER_WEIGHT = 0.8  # Caregiver/organization matches rank below name matches
+SEARCH_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y")
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Lowercase, accent-stripped alphanumeric tokens"""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return re.findall(r"[a-z0-9]+", folded.lower())
+
+def trigrams(term: str, closed: bool = True) -> List[str]:
+    """
+    Trigrams of " term " (closed) or " term" (open). Query terms use the open
+    form so a partially typed name still shares grams with the full token.
+    """
+    padded = f" {term} " if closed else f" {term}"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def deletion_variants(term: str) -> set:
+    """The term and every string one deleted character away from it"""
+    if len(term) < SEARCH_VARIANT_MIN_LENGTH:
+        return set()
+    return {term} | {term[:i] + term[i + 1:] for i in range(len(term))}
+
+def parse_search_date(term: str) -> Optional[str]:
+    for fmt in SEARCH_DATE_FORMATS:
+        try:
+            return datetime.strptime(term, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def build_patient_search(patient: dict, organization_name: Optional[str]) -> dict:
+    permanent_info = patient.get("permanent_info") or {}
+    name = search_terms(patient.get("full_name"))
+    other = search_terms(permanent_info.get("caregiver_name")) + search_terms(organization_name)
+    tokens = sorted(set(name) | set(other))
+    return {
+        "name": sorted(set(name)),
+        "other": sorted(set(other) - set(name)),
+        "tokens": tokens,
+        "grams": sorted({gram for token in tokens for gram in trigrams(token)}),
+        "variants": sorted({variant for token in tokens for variant in deletion_variants(token)})
+    }
+
+async def organization_names() -> dict:
+    return {o["id"]: o.get("name") for o in (await get_reference_snapshot())["organizations"]}
+
+async def refresh_patient_search(patient_ids: Optional[List[str]] = None, batch_size: int = 500) -> int:
+    """Recompute the search subdocument for the given patients (or all patients)"""
+    query = {"id": {"$in": patient_ids}} if patient_ids is not None else {}
+    projection = {"_id": 0, "id": 1, "full_name": 1, "permanent_info.organization": 1, "permanent_info.caregiver_name": 1}
+    names = await organization_names()
+    updated = 0
+    batch = []
+    async for p in db.patients.find(query, projection):
+        organization = (p.get("permanent_info") or {}).get("organization")
+        # Patients created without an organizations document keep the raw value
+        search = build_patient_search(p, names.get(organization, organization))
+        batch.append(UpdateOne({"id": p["id"]}, {"$set": {"search": search}}))
+        if len(batch) >= batch_size:
+            await db.patients.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.patients.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (insert, delete, substitute, transpose)"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[len(b)]
+
+def allowed_edits(term: str) -> int:
+    if len(term) >= 8:
+        return 2
+    if len(term) >= 4:
+        return 1
+    return 0
+
+def term_score(term: str, tokens: List[str]) -> float:
+    """How well one query term matches the best of the tokens, 0..1"""
+    best = 0.0
+    edits = allowed_edits(term)
+    for token in tokens:
+        if token == term:
+            return 1.0
+        if token.startswith(term):
+            best = max(best, 0.9)
+            continue
+        if edits:
+            distance = edit_distance(term, token)
+            if distance <= edits:
+                best = max(best, 0.8 * (1 - distance / max(len(term), len(token))))
+            # Typo in a partially typed name
+            distance = edit_distance(term, token[:len(term)])
+            if distance <= edits:
+                best = max(best, 0.7 * (1 - distance / len(term)))
+    return best
+
+def rank_patient(terms: List[str], search: dict) -> float:
+    if not terms:
+        return 1.0
+    scores = []
+    for term in terms:
+        score = max(
+            term_score(term, search.get("name", [])),
+            SEARCH_OTHER_WEIGHT * term_score(term, search.get("other", []))
+        )
+        if score < SEARCH_MIN_TERM_SCORE:
+            return 0.0
+        scores.append(score)
+    return sum(scores) / len(scores)
+
+def patient_search_query(terms: List[str], dates: List[str], patient_ids: Optional[List[str]]) -> Tuple[dict, List[str], List[str]]:
+    """
+    The candidate filter for search terms and dates of birth, restricted to
+    patient_ids unless None (admins), with the trigrams and deletion variants
+    it matches on.
+    """
+    query = {}
+    if patient_ids is not None:
+        query["id"] = {"$in": patient_ids}
+    if dates:
+        query["permanent_info.date_of_birth"] = {"$in": dates}
+    grams = sorted({gram for term in terms if len(term) >= 2 for gram in trigrams(term, closed=False)})
+    variants = sorted({variant for term in terms for variant in deletion_variants(term)})
+    short = [term for term in terms if len(term) < 2]
+    clauses = [{"search.grams": {"$in": grams}}] if grams else []
+    if variants:
+        clauses.append({"search.variants": {"$in": variants}})
+    # Single characters have no trigram of their own; match them as token prefixes
+    clauses += [{"search.tokens": {"$regex": f"^{re.escape(term)}"}} for term in short]
+    if clauses:
+        query["$or"] = clauses
+    return query, grams, variants
+
+class PatientSearchResult(PatientResponse):
+    score: float  # 0..1, 1 when every term matched a name token exactly
+
+@api_router.get("/patients/search", response_model=List[PatientSearchResult])
+async def search_patients(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Search accessible patients by name, caregiver name, organization name and
+    date of birth (YYYY-MM-DD or MM/DD/YYYY). Tolerates prefixes and small typos.
+    """
+    terms, dates = [], []
+    for raw in q.split():
+        date_of_birth = parse_search_date(raw)
+        if date_of_birth:
+            dates.append(date_of_birth)
+        else:
+            terms.extend(search_terms(raw))
+    if not terms and not dates:
+        return typed_response(List[PatientSearchResult], [])
+    
+    patient_ids = None if nurse.get("is_admin") else list(await accessible_patient_ids(nurse))
+    query, grams, variants = patient_search_query(terms, dates, patient_ids)
+    pipeline = [
+        {"$match": query},
+        # A shared deletion variant is a near-certain one-edit match, so it
+        # outweighs a few incidental shared trigrams
+        {"$addFields": {"_shared": {"$add": [
+            {"$size": {"$setIntersection": [{"$ifNull": ["$search.grams", []]}, grams]}},
+            {"$multiply": [3, {"$size": {"$setIntersection": [{"$ifNull": ["$search.variants", []]}, variants]}}]}
+        ]}}},
+        {"$sort": {"_shared": -1, "full_name": 1}},
+        {"$limit": SEARCH_CANDIDATES},
+        {"$project": {"_id": 0, "_shared": 0}}
+    ]
+    results = []
+    async for patient in db.patients.aggregate(pipeline):
+        score = rank_patient(terms, patient.pop("search", None) or {})
+        if score > 0:
+            patient["score"] = round(score, 4)
+            results.append(apply_activity_summary(patient, nurse))
+    results.sort(key=lambda p: (-p["score"], p["full_name"]))
+    return typed_response(List[PatientSearchResult], results[:limit])
+
+@api_router.post("/admin/maintenance/rebuild-patient-search")
+async def rebuild_patient_search(nurse: dict = Depends(get_current_nurse)):
+    """Backfill the search subdocument for every patient"""
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    updated = await refresh_patient_search()
+    return {"message": "Patient search index rebuilt", "patients_updated": updated}
+
+# ==================== CLINICAL TERMS ====================
+# Medications, allergies and diagnoses are free-text lists. Each patient also
+# stores clinical_terms, the normalized "kind:value" form of every entry
+# ("medication:metformin", "allergy:latex"), so cross-patient questions are a
+# single lookup on the multikey index instead of a regex over every patient.
+CLINICAL_TERM_FIELDS = {
+    "medication": "medications",
+    "allergy": "allergies",
+    "diagnosis": "medical_diagnoses",
+    "psychiatric": "psychiatric_diagnoses",
+}
+NO_KNOWN_ALLERGIES = {"none", "nka", "nkda", "no known allergies", "no known drug allergies", "n a"}
+
+def normalize_clinical_value(kind: str, value: str) -> Optional[str]:
+    """
+    Lowercased, accent-stripped words with parentheticals removed. Medications
+    keep only the name: everything from the first word that starts with a digit
+    (the dose) is dropped, so "Metformin 500mg twice daily" -> "metformin".
+    """
+    value = re.sub(r"\([^)]*\)", " ", value or "")
+    words = search_terms(value)
+    if kind == "medication":
+        for i, word in enumerate(words):
+            if word[0].isdigit():
+                words = words[:i]
+                break
+    normalized = " ".join(words)
+    if not normalized or (kind == "allergy" and normalized in NO_KNOWN_ALLERGIES):
+        return None
+    return normalized
+
+def clinical_terms(permanent_info: Optional[dict]) -> List[str]:
+    permanent_info = permanent_info or {}
+    terms = set()
+    for kind, field in CLINICAL_TERM_FIELDS.items():
+        for value in permanent_info.get(field) or []:
+            if not isinstance(value, str):
+                continue
+            normalized = normalize_clinical_value(kind, value)
+            if normalized:
+                terms.add(f"{kind}:{normalized}")
+                # "Metformin ER" also answers a query for "metformin"
+                if kind == "medication" and " " in normalized:
+                    terms.add(f"{kind}:{normalized.split()[0]}")
+    return sorted(terms)
+
+async def rebuild_clinical_terms(batch_size: int = 500) -> int:
+    """Backfill clinical_terms for every patient"""
+    updated = 0
+    batch = []
+    projection = {"_id": 0, "id": 1, **{f"permanent_info.{field}": 1 for field in CLINICAL_TERM_FIELDS.values()}}
+    async for p in db.patients.find({}, projection):
+        batch.append(UpdateOne({"id": p["id"]}, {"$set": {"clinical_terms": clinical_terms(p.get("permanent_info"))}}))
+        if len(batch) >= batch_size:
+            await db.patients.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.patients.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+class OrganizationCount(BaseModel):
+    organization: Optional[str] = None
+    count: int
+
+class ClinicalTermMatches(BaseModel):
+    term: str  # Normalized "kind:value" that was looked up
+    total: int
+    organizations: List[OrganizationCount]  # Matching patients per organization, largest first
+    patients: List[PatientResponse]  # First `limit` matches by name
+
+@api_router.get("/clinical-terms/patients", response_model=ClinicalTermMatches)
+async def find_patients_by_clinical_term(
+    kind: str = Query(..., pattern="^(medication|allergy|diagnosis|psychiatric)$"),
+    value: str = Query(..., min_length=1, max_length=200),
+    organization: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Accessible patients with a medication, allergy or diagnosis, e.g.
+    kind=medication&value=Metformin, plus how many match in each organization.
+    """
+    normalized = normalize_clinical_value(kind, value)
+    if not normalized:
+        raise HTTPException(status_code=400, detail="value has no searchable words")
+    term = f"{kind}:{normalized}"
+    
+    match = {"clinical_terms": term}
+    if organization:
+        match["permanent_info.organization"] = organization
+    if not nurse.get("is_admin"):
+        match["id"] = {"$in": list(await accessible_patient_ids(nurse))}
+    pipeline = [
+        {"$match": match},
+        {"$facet": {
+            "organizations": [
+                {"$group": {"_id": "$permanent_info.organization", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ],
+            "patients": [
+                {"$sort": {"full_name": 1, "id": 1}},
+                {"$limit": limit},
+                {"$project": {"_id": 0, "search": 0, "clinical_terms": 0}}
+            ]
+        }}
+    ]
+    result = (await db.patients.aggregate(pipeline).to_list(1))[0]
+    organizations = [{"organization": o["_id"], "count": o["count"]} for o in result["organizations"]]
+    return typed_response(ClinicalTermMatches, {
+        "term": term,
+        "total": sum(o["count"] for o in organizations),
+        "organizations": organizations,
+        "patients": [apply_activity_summary(p, nurse) for p in result["patients"]]
+    })
+
+@api_router.post("/admin/maintenance/rebuild-clinical-terms")
+async def rebuild_clinical_terms_endpoint(nurse: dict = Depends(get_current_nurse)):
+    """Backfill the normalized clinical_terms of every patient"""
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    updated = await rebuild_clinical_terms()
+    return {"message": "Clinical terms rebuilt", "patients_updated": updated}
 
 # ==================== PATIENT ENDPOINTS ====================
 @api_router.post("/patients", response_model=PatientResponse)
@@ -805,78 +2104,30 @@ async def create_patient(data: PatientCreate, nurse: dict = Depends(get_current_
         "permanent_info": permanent_info,
         "nurse_id": nurse["id"],  # Creator
         "assigned_nurses": [nurse["id"]],  # Admin is auto-assigned
+        "clinical_terms": clinical_terms(permanent_info),
         "created_at": now,
         "updated_at": now,
         "last_vitals": None
     }
     await db.patients.insert_one(patient_doc)
+    await refresh_activity_summaries([patient_id])
+    await refresh_patient_search([patient_id])
     
-    return PatientResponse(
-        id=patient_id,
-        full_name=data.full_name,
-        permanent_info=PatientPermanentInfo(**permanent_info),
-        nurse_id=nurse["id"],
-        assigned_nurses=[nurse["id"]],
-        created_at=now,
-        updated_at=now,
-        last_vitals=None,
-        is_assigned_to_me=True
-    )
+    created = await db.patients.find_one({"id": patient_id}, {"_id": 0})
+    return PatientResponse(**apply_activity_summary(created, nurse))
 
-@api_router.get("/patients", response_model=List[PatientResponse])
-async def list_patients(nurse: dict = Depends(get_current_nurse)):
+@api_router.get("/patients", response_model=Page[PatientResponse])
+async def list_patients(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
     # All nurses can see all patients, but with assignment info
-    patients = await db.patients.find({}, {"_id": 0}).to_list(1000)
-    
-    # Enrich each patient with last visit and last UTC info
-    enriched_patients = []
-    for p in patients:
-        # Get last visit (completed only, exclude daily_note as they are not visits)
-        last_visit = await db.visits.find_one(
-            {"patient_id": p["id"], "status": "completed", "visit_type": {"$ne": "daily_note"}},
-            {"_id": 0, "id": 1, "visit_date": 1, "vital_signs": 1},
-            sort=[("visit_date", -1)]
-        )
-        
-        # Get last UTC record (sorted by created_at for precise ordering)
-        last_utc = await db.unable_to_contact.find_one(
-            {"patient_id": p["id"]},
-            {"_id": 0, "id": 1, "attempt_date": 1, "individual_location": 1, "individual_location_other": 1},
-            sort=[("created_at", -1)]
-        )
-        
-        p["last_visit_id"] = last_visit.get("id") if last_visit else None
-        p["last_visit_date"] = last_visit.get("visit_date") if last_visit else None
-        p["last_vitals_date"] = last_visit.get("visit_date") if last_visit else None
-        
-        # Include UTC regardless of date (show most recent UTC)
-        if last_utc:
-            location_map = {
-                "admitted": "Hospitalized",
-                "medical_appointment": "Medical Appt",
-                "overnight_family": "Overnight w/Family",
-                "outing": "Outing",
-                "moved_temporarily": "Temp Move",
-                "moved_permanently": "Perm Move",
-                "deceased": "Deceased",
-                "other": last_utc.get("individual_location_other", "Other")
-            }
-            p["last_utc"] = {
-                "id": last_utc.get("id"),
-                "date": last_utc.get("attempt_date"),
-                "reason": location_map.get(last_utc.get("individual_location"), "Unknown")
-            }
-        else:
-            p["last_utc"] = None
-        
-        # Check if current nurse is assigned
-        assigned_nurses = p.get("assigned_nurses", [])
-        p["is_assigned_to_me"] = nurse["id"] in assigned_nurses or nurse.get("is_admin", False)
-        p["assigned_nurses"] = assigned_nurses
-        
-        enriched_patients.append(PatientResponse(**p))
-    
-    return enriched_patients
+    patients, next_cursor = await fetch_page(db.patients, {}, "full_name", ASCENDING, limit, cursor)
+    return typed_response(Page[PatientResponse], {
+        "items": [apply_activity_summary(p, nurse) for p in patients],
+        "next_cursor": next_cursor
+    })
 
 @api_router.get("/patients/{patient_id}", response_model=PatientResponse)
 async def get_patient(patient_id: str, nurse: dict = Depends(get_current_nurse)):
@@ -884,36 +2135,32 @@ async def get_patient(patient_id: str, nurse: dict = Depends(get_current_nurse))
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    assigned_nurses = patient.get("assigned_nurses", [])
-    patient["is_assigned_to_me"] = nurse["id"] in assigned_nurses or nurse.get("is_admin", False)
-    patient["assigned_nurses"] = assigned_nurses
-    
-    return PatientResponse(**patient)
+    return typed_response(PatientResponse, apply_activity_summary(patient, nurse))
 
 @api_router.put("/patients/{patient_id}", response_model=PatientResponse)
 async def update_patient(patient_id: str, data: PatientUpdate, nurse: dict = Depends(get_current_nurse)):
-    patient = await db.patients.find_one({"id": patient_id})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
-    # Check if nurse is assigned or is admin
-    assigned_nurses = patient.get("assigned_nurses", [])
-    if nurse["id"] not in assigned_nurses and not nurse.get("is_admin"):
-        raise HTTPException(status_code=403, detail="You are not assigned to this patient")
+    await require_patient_access(nurse, patient_id)
     
     update_data = {}
     if data.full_name:
         update_data["full_name"] = data.full_name
     if data.permanent_info:
         update_data["permanent_info"] = data.permanent_info.model_dump()
+        update_data["clinical_terms"] = clinical_terms(update_data["permanent_info"])
     if data.assigned_nurses is not None and nurse.get("is_admin"):
         update_data["assigned_nurses"] = data.assigned_nurses
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.patients.update_one({"id": patient_id}, {"$set": update_data})
+    # Organization and assignments decide who can access the patient
+    await patient_access_version.bump()
+    if data.permanent_info:
+        # visit_frequency may have changed
+        await refresh_activity_summaries([patient_id])
+    if data.full_name or data.permanent_info:
+        await refresh_patient_search([patient_id])
     updated = await db.patients.find_one({"id": patient_id}, {"_id": 0})
-    updated["is_assigned_to_me"] = nurse["id"] in updated.get("assigned_nurses", []) or nurse.get("is_admin", False)
-    return PatientResponse(**updated)
+    return PatientResponse(**apply_activity_summary(updated, nurse))
 
 @api_router.delete("/patients/{patient_id}")
 async def delete_patient(patient_id: str, nurse: dict = Depends(get_current_nurse)):
@@ -921,109 +2168,302 @@ async def delete_patient(patient_id: str, nurse: dict = Depends(get_current_nurs
     if not nurse.get("is_admin"):
         raise HTTPException(status_code=403, detail="Only admin can delete patients")
     
-    result = await db.patients.delete_one({"id": patient_id})
-    if result.deleted_count == 0:
+    if not await db.patients.find_one({"id": patient_id}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Patient not found")
-    # Also delete all visits, UTC records, and interventions for this patient
+    # Delete all visits, UTC records, and interventions first and the patient
+    # last, so a failure part-way can be retried instead of leaving orphans
+    await remove_patient_from_rollups(patient_id)
     await db.visits.delete_many({"patient_id": patient_id})
+    await db.vitals_series.delete_many({"patient_id": patient_id})
+    # Incident reports outlive the patient; only the per-patient records go
+    await db.clinical_notes.delete_many({"patient_ids": patient_id, "source": {"$ne": "incident_report"}})
+    await invalidate_last_visits([patient_id])
     await db.unable_to_contact.delete_many({"patient_id": patient_id})
     await db.interventions.delete_many({"patient_id": patient_id})
+    await db.patients.delete_one({"id": patient_id})
+    await patient_access_version.bump()
+    # Clients drop a deleted patient's visits, UTC records and interventions with it
+    await record_deletion("patients", patient_id, patient_id)
     return {"message": "Patient deleted successfully"}
 
+# ==================== COMPACT VISIT STORAGE ====================
+# Visit documents only hold what was actually entered: fields equal to their
+# default, blank strings and empty sections are dropped on write and restored
+# by VisitResponse (or expand_visit) on read.
+VISIT_SCHEMA_VERSION = 2
+EMPTY_VALUES = (None, "", [], {})
+ALWAYS_STORED = ("visit_type", "status", "organization")  # Queried, indexed or rolled up
+
+def compact_value(value):
+    if isinstance(value, dict):
+        value = {key: compact_value(sub_value) for key, sub_value in value.items()}
+        return {key: sub_value for key, sub_value in value.items() if sub_value not in EMPTY_VALUES}
+    return value
+
+def compact_visit_fields(data: VisitCreate, exclude: set = frozenset()) -> dict:
+    """Storage form of a visit's clinical fields (everything but visit_date)"""
+    fields = compact_value(data.model_dump(exclude_defaults=True, exclude={"visit_date", *exclude}))
+    for field in ALWAYS_STORED:
+        fields[field] = getattr(data, field)
+    return fields
+
+def expand_visit(visit: dict) -> dict:
+    """Fill a raw visit document back out to the full shape, for readers that bypass VisitResponse"""
+    for name, model in VISIT_SECTIONS:
+        visit[name] = model(**(visit.get(name) or {})).model_dump()
+    for name, field in VisitCreate.model_fields.items():
+        if name not in visit:
+            visit[name] = field.get_default(call_default_factory=True)
+    return visit
+
+# ==================== CARRY FORWARD FROM LAST VISIT ====================
+def _flagged_fields(model) -> List[str]:
+    return [name for name in model.model_fields if f"{name}_from_last" in model.model_fields]
+
+# Section fields a new visit can take over from the last completed visit.
+# Height has no flag; it is only prefilled because it rarely changes.
+CARRY_FORWARD_FIELDS = {
+    "vital_signs": ["height"],
+    "physical_assessment": _flagged_fields(PhysicalAssessment),
+    "head_to_toe": _flagged_fields(HeadToToeAssessment),
+}
+
+LAST_VISIT_PROJECTION = {
+    "_id": 0, "id": 1, "visit_date": 1,
+    **{f"{section}.{field}": 1 for section, fields in CARRY_FORWARD_FIELDS.items() for field in fields}
+}
+
+class VisitPrefill(BaseModel):
+    last_visit_id: Optional[str] = None
+    last_visit_date: Optional[DateString] = None
+    vital_signs: dict = {}
+    physical_assessment: dict = {}
+    head_to_toe: dict = {}
+
+LAST_VISIT_SORT = [("visit_date", DESCENDING), ("id", DESCENDING)]
+
+def completed_visits_query(patient_id: str) -> dict:
+    return {"patient_id": patient_id, "status": "completed"}
+
+last_visit_version = SharedVersion("last_visits")
+
+async def get_last_visit_fields(patient_id: str, cached: bool = True) -> dict:
+    """
+    Carry-forward fields of the patient's last completed visit, through
+    last_visit_cache unless cached is False
+    """
+    if cached:
+        version = await last_visit_version.current()
+        entry = last_visit_cache.get(patient_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        epoch = last_visit_cache.epoch
+    last = await db.visits.find_one(
+        completed_visits_query(patient_id),
+        LAST_VISIT_PROJECTION,
+        sort=LAST_VISIT_SORT
+    ) or {}
+    if cached:
+        last_visit_cache.set(patient_id, (version, last), epoch=epoch)
+    return last
+
+async def invalidate_last_visits(patient_ids: List[str]):
+    """Call after a visit write; other workers drop their entries on the version bump"""
+    await last_visit_version.bump()
+    for patient_id in patient_ids:
+        last_visit_cache.invalidate(patient_id)
+
+def pending_carry_forward(data: BaseModel) -> dict:
+    """Section -> fields flagged *_from_last but sent without a value"""
+    pending = {}
+    for section, fields in CARRY_FORWARD_FIELDS.items():
+        value = getattr(data, section, None)
+        if value is None:
+            continue
+        flagged = [f for f in fields if getattr(value, f"{f}_from_last", False) and getattr(value, f) in EMPTY_VALUES]
+        if flagged:
+            pending[section] = flagged
+    return pending
+
+async def resolve_carry_forward(patient_id: str, data: BaseModel, exclude_visit_id: Optional[str] = None):
+    """
+    Fill flagged-but-empty fields of a VisitCreate or VisitPatch in place from
+    the last completed visit, so clients no longer have to fetch and copy it.
+    Values the client did send are kept as they are.
+    """
+    pending = pending_carry_forward(data)
+    if not pending:
+        return
+    # Read fresh: a cached entry may lag a visit completed on another worker,
+    # and its values would be written into this record
+    last = await get_last_visit_fields(patient_id, cached=False)
+    if not last or last.get("id") == exclude_visit_id:
+        return
+    for section, fields in pending.items():
+        fills = {f: last.get(section, {}).get(f) for f in fields}
+        fills = {f: value for f, value in fills.items() if value not in EMPTY_VALUES}
+        if fills:
+            current = getattr(data, section)
+            setattr(data, section, type(current).model_validate({**current.model_dump(exclude_unset=True), **fills}))
+
 # ==================== VISIT ENDPOINTS ====================
+def build_visit_doc(patient_id: str, data: VisitCreate, nurse_id: str, now: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "patient_id": patient_id,
+        "nurse_id": nurse_id,
+        "visit_date": to_bson_date(data.visit_date or now),
+        **compact_visit_fields(data),
+        "schema_version": VISIT_SCHEMA_VERSION,
+        "version": 1,
+        "created_at": now,
+        "updated_at": now
+    }
+
 @api_router.post("/patients/{patient_id}/visits", response_model=VisitResponse)
 async def create_visit(patient_id: str, data: VisitCreate, nurse: dict = Depends(get_current_nurse)):
-    patient = await db.patients.find_one({"id": patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    await require_patient_access(nurse, patient_id)
     
-    visit_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
-    visit_date = data.visit_date or now
-    
-    visit_doc = {
-        "id": visit_id,
-        "patient_id": patient_id,
-        "nurse_id": nurse["id"],
-        "visit_date": visit_date,
-        "visit_type": data.visit_type,
-        "organization": data.organization,
-        "vital_signs": data.vital_signs.model_dump(),
-        "physical_assessment": data.physical_assessment.model_dump(),
-        "head_to_toe": data.head_to_toe.model_dump(),
-        "gastrointestinal": data.gastrointestinal.model_dump(),
-        "genito_urinary": data.genito_urinary.model_dump(),
-        "respiratory": data.respiratory.model_dump(),
-        "endocrine": data.endocrine.model_dump(),
-        "changes_since_last": data.changes_since_last.model_dump(),
-        "home_visit_logbook": data.home_visit_logbook.model_dump(),
-        "overall_health_status": data.overall_health_status,
-        "nurse_notes": data.nurse_notes,
-        "daily_note_content": data.daily_note_content,
-        "status": data.status,
-        "attachments": data.attachments or [],
-        "screening_completed_by": data.screening_completed_by,
-        "reviewed_and_signed_by": data.reviewed_and_signed_by,
-        "created_at": now
-    }
+    await resolve_carry_forward(patient_id, data)
+    visit_doc = build_visit_doc(patient_id, data, nurse["id"], now)
     await db.visits.insert_one(visit_doc)
+    await invalidate_last_visits([patient_id])
+    await refresh_activity_summaries([patient_id])
+    await update_monthly_rollups(added=visit_doc)
+    await sync_vitals_series([visit_doc])
+    await index_clinical_notes("visit", [visit_doc])
     
-    # Update patient's last_vitals
-    await db.patients.update_one(
-        {"id": patient_id},
-        {"$set": {
-            "last_vitals": data.vital_signs.model_dump(),
-            "updated_at": now
-        }}
-    )
-    
-    return VisitResponse(
-        id=visit_id,
-        patient_id=patient_id,
-        nurse_id=nurse["id"],
-        visit_date=visit_date,
-        visit_type=data.visit_type,
-        organization=data.organization,
-        vital_signs=data.vital_signs,
-        physical_assessment=data.physical_assessment,
-        head_to_toe=data.head_to_toe,
-        gastrointestinal=data.gastrointestinal,
-        genito_urinary=data.genito_urinary,
-        respiratory=data.respiratory,
-        endocrine=data.endocrine,
-        changes_since_last=data.changes_since_last,
-        home_visit_logbook=data.home_visit_logbook,
-        overall_health_status=data.overall_health_status,
-        nurse_notes=data.nurse_notes,
-        daily_note_content=data.daily_note_content,
-        status=data.status,
-        attachments=data.attachments or [],
-        screening_completed_by=data.screening_completed_by,
-        reviewed_and_signed_by=data.reviewed_and_signed_by,
-        created_at=now
-    )
+    visit_doc.pop("_id", None)
+    return VisitResponse(**visit_doc)
 
-@api_router.get("/patients/{patient_id}/visits", response_model=List[VisitResponse])
-async def list_visits(patient_id: str, nurse: dict = Depends(get_current_nurse)):
-    patient = await db.patients.find_one({"id": patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
-    visits = await db.visits.find({"patient_id": patient_id}, {"_id": 0}).sort("visit_date", -1).to_list(1000)
-    return [VisitResponse(**v) for v in visits]
+# Offline-collected forms are synced in batches of at most this many visits
+MAX_VISIT_BATCH = 500
 
-@api_router.get("/visits/{visit_id}", response_model=VisitResponse)
-async def get_visit(visit_id: str, nurse: dict = Depends(get_current_nurse)):
-    visit = await db.visits.find_one({"id": visit_id, "nurse_id": nurse["id"]}, {"_id": 0})
-    if not visit:
+class VisitBatchItem(BaseModel):
+    patient_id: str
+    client_id: Optional[str] = None  # Client-generated id; makes retries of the same form idempotent
+    visit: VisitCreate
+
+class VisitBatchResult(BaseModel):
+    index: int
+    client_id: Optional[str] = None
+    patient_id: Optional[str] = None
+    status: str  # created, duplicate, rejected
+    visit_id: Optional[str] = None
+    error: Optional[str] = None
+
+@api_router.post("/visits/batch", response_model=List[VisitBatchResult])
+async def create_visits_batch(items: List[dict], nurse: dict = Depends(get_current_nurse)):
+    """
+    Create many visits across patients in a few round trips. Each item is
+    {"patient_id", "client_id", "visit": VisitCreate} and is validated on its
+    own, so one bad form does not reject the rest of the batch. Results are
+    returned in request order.
+    """
+    if len(items) > MAX_VISIT_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_VISIT_BATCH} visits per batch")
+    
+    results = []
+    parsed = []
+    for index, raw in enumerate(items):
+        try:
+            item = VisitBatchItem.model_validate(raw)
+        except ValidationError as e:
+            results.append(VisitBatchResult(
+                index=index,
+                client_id=raw.get("client_id"),
+                patient_id=raw.get("patient_id"),
+                status="rejected",
+                error=str(e.errors(include_url=False))
+            ))
+            continue
+        results.append(VisitBatchResult(index=index, client_id=item.client_id, patient_id=item.patient_id, status="pending"))
+        parsed.append((index, item))
+    
+    allowed = await accessible_subset(nurse, [item.patient_id for _, item in parsed])
+    
+    now = datetime.now(timezone.utc).isoformat()
+    docs = []
+    doc_indexes = []
+    for index, item in parsed:
+        if item.patient_id not in allowed:
+            results[index].status = "rejected"
+            results[index].error = "Patient not found"
+            continue
+        await resolve_carry_forward(item.patient_id, item.visit)
+        doc = build_visit_doc(item.patient_id, item.visit, nurse["id"], now)
+        if item.client_id:
+            doc["client_id"] = item.client_id
+        docs.append(doc)
+        doc_indexes.append(index)
+    
+    failed = {}
+    if docs:
+        try:
+            await db.visits.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+    
+    inserted = []
+    duplicates = {}
+    for position, (index, doc) in enumerate(zip(doc_indexes, docs)):
+        err = failed.get(position)
+        if err is None:
+            results[index].status = "created"
+            results[index].visit_id = doc["id"]
+            inserted.append(doc)
+        elif err.get("code") == 11000 and doc.get("client_id"):
+            results[index].status = "duplicate"
+            duplicates[doc["client_id"]] = index
+        else:
+            results[index].status = "rejected"
+            results[index].error = err.get("errmsg", "Write failed")
+    
+    # Report the id of the visit a retried form already created
+    if duplicates:
+        async for v in db.visits.find({"nurse_id": nurse["id"], "client_id": {"$in": list(duplicates)}}, {"_id": 0, "id": 1, "client_id": 1}):
+            results[duplicates[v["client_id"]]].visit_id = v["id"]
+    
+    if inserted:
+        inserted_patients = list({doc["patient_id"] for doc in inserted})
+        await invalidate_last_visits(inserted_patients)
+        await refresh_activity_summaries(inserted_patients)
+        await db.monthly_rollups.bulk_write([rollup_delta(doc, 1) for doc in inserted], ordered=False)
+        await sync_vitals_series(inserted)
+        await index_clinical_notes("visit", inserted)
+    return results
+
+@api_router.get("/patients/{patient_id}/visits", response_model=Page[VisitResponse])
+async def list_visits(
+    patient_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    await require_patient_access(nurse, patient_id)
+    
+    visits, next_cursor = await fetch_page(db.visits, {"patient_id": patient_id}, "visit_date", DESCENDING, limit, cursor)
+    return typed_response(Page[VisitResponse], {"items": visits, "next_cursor": next_cursor})
+
+@api_router.get("/visits/{visit_id}", response_model=VisitResponse)
+async def get_visit(visit_id: str, nurse: dict = Depends(get_current_nurse)):
+    visit = await db.visits.find_one({"id": visit_id, "nurse_id": nurse["id"]}, {"_id": 0})
+    if not visit:
         raise HTTPException(status_code=404, detail="Visit not found")
-    return VisitResponse(**visit)
+    return typed_response(VisitResponse, visit)
 
 @api_router.delete("/visits/{visit_id}")
 async def delete_visit(visit_id: str, nurse: dict = Depends(get_current_nurse)):
-    result = await db.visits.delete_one({"id": visit_id, "nurse_id": nurse["id"]})
-    if result.deleted_count == 0:
+    visit = await db.visits.find_one_and_delete({"id": visit_id, "nurse_id": nurse["id"]}, {"_id": 0})
+    if not visit:
         raise HTTPException(status_code=404, detail="Visit not found")
+    await invalidate_last_visits([visit["patient_id"]])
+    await refresh_activity_summaries([visit["patient_id"]])
+    await update_monthly_rollups(removed=visit)
+    await db.vitals_series.delete_one({"visit_id": visit_id})
+    await unindex_clinical_notes("visit", [visit_id])
+    await record_deletion("visits", visit_id, visit["patient_id"])
     return {"message": "Visit deleted successfully"}
 
 @api_router.put("/visits/{visit_id}", response_model=VisitResponse)
@@ -1032,49 +2472,170 @@ async def update_visit(visit_id: str, data: VisitCreate, nurse: dict = Depends(g
     if not visit:
         raise HTTPException(status_code=404, detail="Visit not found")
     
+    await resolve_carry_forward(visit["patient_id"], data, exclude_visit_id=visit_id)
+    # Full replacement of the clinical fields; anything now empty is removed from the document.
+    # The signature fields are only written at creation.
+    fields = compact_visit_fields(data, exclude={"screening_completed_by", "reviewed_and_signed_by"})
     update_doc = {
-        "visit_date": data.visit_date or visit["visit_date"],
-        "visit_type": data.visit_type,
-        "organization": data.organization,
-        "vital_signs": data.vital_signs.model_dump(),
-        "physical_assessment": data.physical_assessment.model_dump(),
-        "head_to_toe": data.head_to_toe.model_dump(),
-        "gastrointestinal": data.gastrointestinal.model_dump(),
-        "genito_urinary": data.genito_urinary.model_dump(),
-        "respiratory": data.respiratory.model_dump(),
-        "endocrine": data.endocrine.model_dump(),
-        "changes_since_last": data.changes_since_last.model_dump(),
-        "home_visit_logbook": data.home_visit_logbook.model_dump(),
-        "overall_health_status": data.overall_health_status,
-        "nurse_notes": data.nurse_notes,
-        "daily_note_content": data.daily_note_content,
-        "status": data.status,
-        "attachments": data.attachments or [],
+        "visit_date": to_bson_date(data.visit_date) if data.visit_date else visit["visit_date"],
+        **fields,
+        "schema_version": VISIT_SCHEMA_VERSION,
+        "updated_at": datetime.now(timezone.utc).isoformat()
     }
+    cleared = {
+        field: "" for field in VisitCreate.model_fields
+        if field not in update_doc and field not in ("screening_completed_by", "reviewed_and_signed_by")
+    }
+    update = {"$set": update_doc, "$inc": {"version": 1}}
+    if cleared:
+        update["$unset"] = cleared
     
-    await db.visits.update_one({"id": visit_id}, {"$set": update_doc})
+    await db.visits.update_one({"id": visit_id}, update)
+    await invalidate_last_visits([visit["patient_id"]])
+    await refresh_activity_summaries([visit["patient_id"]])
+    await update_monthly_rollups(removed=visit, added={**visit, **update_doc})
     updated = await db.visits.find_one({"id": visit_id}, {"_id": 0})
+    await sync_vitals_series([updated])
+    await index_clinical_notes("visit", [updated])
+    return VisitResponse(**updated)
+
+# Fields whose change affects the patient activity summary, the monthly rollups or the vitals series
+SUMMARY_FIELDS = {"visit_date", "visit_type", "status", "vital_signs"}
+ROLLUP_FIELDS = {"visit_date", "visit_type", "organization"}
+VITALS_FIELDS = {"visit_date", "status", "vital_signs"}
+NOTES_FIELDS = {"visit_date", "status", "organization", "nurse_notes", "daily_note_content", "changes_since_last", "home_visit_logbook"}
+
+def visit_patch_updates(data: VisitPatch) -> Tuple[dict, List[str]]:
+    """
+    Translate the fields present in a VisitPatch into dotted-path $set updates,
+    plus the paths to $unset because they were cleared back to their default.
+    """
+    sections = dict(VISIT_SECTIONS)
+    updates = {}
+    cleared = []
+    for field in data.model_fields_set - {"version"}:
+        value = getattr(data, field)
+        if field in sections:
+            if value is None:
+                continue
+            model_fields = sections[field].model_fields
+            for key, sub_value in value.model_dump(exclude_unset=True).items():
+                sub_value = compact_value(sub_value)
+                if sub_value in EMPTY_VALUES or sub_value == model_fields[key].default:
+                    cleared.append(f"{field}.{key}")
+                else:
+                    updates[f"{field}.{key}"] = sub_value
+        elif field in ("visit_date", "visit_type", "status"):
+            # Required on every visit; null means "leave unchanged"
+            if value is not None:
+                updates[field] = to_bson_date(value) if field == "visit_date" else value
+        elif field in ALWAYS_STORED or value not in EMPTY_VALUES:
+            updates[field] = value
+        else:
+            cleared.append(field)
+    return updates, cleared
+
+def apply_dotted_updates(doc: dict, updates: dict, cleared: List[str] = ()) -> dict:
+    for path, value in updates.items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for key in parents:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        target[leaf] = value
+    for path in cleared:
+        target = doc
+        *parents, leaf = path.split(".")
+        for key in parents:
+            target = target.get(key) if isinstance(target, dict) else None
+        if isinstance(target, dict):
+            target.pop(leaf, None)
+    return doc
+
+@api_router.patch("/visits/{visit_id}", response_model=VisitResponse)
+async def patch_visit(visit_id: str, data: VisitPatch, nurse: dict = Depends(get_current_nurse)):
+    """
+    Write only the sections and fields that are sent (e.g. draft autosave).
+    The update applies only if the stored version still equals data.version,
+    otherwise it fails with 409 and the client should reload.
+    """
+    if pending_carry_forward(data):
+        # patient_id never changes, so it can be read ahead of the versioned update
+        visit = await db.visits.find_one({"id": visit_id, "nurse_id": nurse["id"]}, {"_id": 0, "patient_id": 1})
+        if visit:
+            await resolve_carry_forward(visit["patient_id"], data, exclude_visit_id=visit_id)
+    updates, cleared = visit_patch_updates(data)
+    updates["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update = {"$set": updates, "$inc": {"version": 1}}
+    if cleared:
+        update["$unset"] = {path: "" for path in cleared}
+    
+    # Legacy visits have no version field and count as version 0
+    version_filter = {"$in": [0, None]} if data.version == 0 else data.version
+    before = await db.visits.find_one_and_update(
+        {"id": visit_id, "nurse_id": nurse["id"], "version": version_filter},
+        update,
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        current = await db.visits.find_one({"id": visit_id, "nurse_id": nurse["id"]}, {"_id": 0, "version": 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Visit not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Visit was modified elsewhere (current version {current.get('version', 0)})"
+        )
+    
+    # The pre-image is kept for rollups; the response is the pre-image with the patch applied
+    updated = apply_dotted_updates(copy.deepcopy(before), updates, cleared)
+    updated["version"] = before.get("version", 0) + 1
+    
+    await invalidate_last_visits([before["patient_id"]])
+    sent = data.model_fields_set
+    if sent & SUMMARY_FIELDS:
+        await refresh_activity_summaries([before["patient_id"]])
+    if sent & ROLLUP_FIELDS:
+        await update_monthly_rollups(removed=before, added=updated)
+    if sent & VITALS_FIELDS:
+        await sync_vitals_series([updated])
+    if sent & NOTES_FIELDS:
+        await index_clinical_notes("visit", [updated])
     return VisitResponse(**updated)
 
+@api_router.get("/patients/{patient_id}/visits/prefill", response_model=VisitPrefill)
+async def get_visit_prefill(patient_id: str, nurse: dict = Depends(get_current_nurse)):
+    """
+    The fields a new visit form can pull from the last completed visit. Empty
+    when the patient has no completed visit yet.
+    """
+    await require_patient_access(nurse, patient_id)
+    last = await get_last_visit_fields(patient_id)
+    return typed_response(VisitPrefill, {
+        "last_visit_id": last.get("id"),
+        "last_visit_date": last.get("visit_date"),
+        **{section: last.get(section, {}) for section in CARRY_FORWARD_FIELDS}
+    })
+
 @api_router.get("/patients/{patient_id}/visits/last", response_model=VisitResponse)
 async def get_last_visit(patient_id: str, nurse: dict = Depends(get_current_nurse)):
     """Get the most recent completed visit for a patient (for pulling data from last visit)"""
+    await require_patient_access(nurse, patient_id)
     visit = await db.visits.find_one(
-        {"patient_id": patient_id, "status": "completed"},
+        completed_visits_query(patient_id),
         {"_id": 0},
         sort=[("visit_date", -1)]
     )
     if not visit:
         raise HTTPException(status_code=404, detail="No previous visits found")
-    return VisitResponse(**visit)
+    return typed_response(VisitResponse, visit)
 
 # ==================== UNABLE TO CONTACT ENDPOINTS ====================
 @api_router.post("/unable-to-contact", response_model=UnableToContactResponse)
 async def create_unable_to_contact(data: UnableToContactCreate, nurse: dict = Depends(get_current_nurse)):
-    # Verify patient exists and belongs to nurse
-    patient = await db.patients.find_one({"id": data.patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    await require_patient_access(nurse, data.patient_id)
+    patient = await db.patients.find_one({"id": data.patient_id}, {"_id": 0, "full_name": 1, "permanent_info.date_of_birth": 1}) or {}
     
     record_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
@@ -1084,7 +2645,7 @@ async def create_unable_to_contact(data: UnableToContactCreate, nurse: dict = De
         "patient_id": data.patient_id,
         "nurse_id": nurse["id"],
         "visit_type": data.visit_type,
-        "attempt_date": data.attempt_date,
+        "attempt_date": to_bson_date(data.attempt_date),
         "attempt_time": data.attempt_time,
         "attempt_location": data.attempt_location,
         "attempt_location_other": data.attempt_location_other,
@@ -1096,9 +2657,11 @@ async def create_unable_to_contact(data: UnableToContactCreate, nurse: dict = De
         "admission_date": data.admission_date,
         "admission_reason": data.admission_reason,
         "additional_info": data.additional_info,
-        "created_at": now
+        "created_at": now,
+        "updated_at": now
     }
     await db.unable_to_contact.insert_one(record_doc)
+    await refresh_activity_summaries([data.patient_id])
     
     return UnableToContactResponse(
         id=record_id,
@@ -1106,7 +2669,7 @@ async def create_unable_to_contact(data: UnableToContactCreate, nurse: dict = De
         patient_name=patient.get("full_name"),
         nurse_id=nurse["id"],
         visit_type=data.visit_type,
-        attempt_date=data.attempt_date,
+        attempt_date=record_doc["attempt_date"],
         attempt_time=data.attempt_time,
         attempt_location=data.attempt_location,
         attempt_location_other=data.attempt_location_other,
@@ -1121,16 +2684,20 @@ async def create_unable_to_contact(data: UnableToContactCreate, nurse: dict = De
         created_at=now
     )
 
-@api_router.get("/patients/{patient_id}/unable-to-contact", response_model=List[UnableToContactResponse])
-async def list_unable_to_contact(patient_id: str, nurse: dict = Depends(get_current_nurse)):
-    patient = await db.patients.find_one({"id": patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+@api_router.get("/patients/{patient_id}/unable-to-contact", response_model=Page[UnableToContactResponse])
+async def list_unable_to_contact(
+    patient_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    await require_patient_access(nurse, patient_id)
     
-    records = await db.unable_to_contact.find({"patient_id": patient_id}, {"_id": 0}).sort("attempt_date", -1).to_list(1000)
+    patient = await db.patients.find_one({"id": patient_id}, {"_id": 0, "full_name": 1}) or {}
+    records, next_cursor = await fetch_page(db.unable_to_contact, {"patient_id": patient_id}, "attempt_date", DESCENDING, limit, cursor)
     for r in records:
         r["patient_name"] = patient.get("full_name")
-    return [UnableToContactResponse(**r) for r in records]
+    return typed_response(Page[UnableToContactResponse], {"items": records, "next_cursor": next_cursor})
 
 @api_router.get("/unable-to-contact/{record_id}", response_model=UnableToContactResponse)
 async def get_unable_to_contact(record_id: str, nurse: dict = Depends(get_current_nurse)):
@@ -1139,92 +2706,63 @@ async def get_unable_to_contact(record_id: str, nurse: dict = Depends(get_curren
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
     
-    # Get patient info
-    patient = await db.patients.find_one({"id": record["patient_id"]}, {"_id": 0})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
-    # Check if current nurse has access to this patient
-    is_assigned = nurse["id"] in patient.get("assigned_nurses", [])
-    is_admin = nurse.get("is_admin", False)
-    has_org_access = patient.get("permanent_info", {}).get("organization") in nurse.get("assigned_organizations", [])
-    
-    if not (is_assigned or is_admin or has_org_access):
-        raise HTTPException(status_code=403, detail="Not authorized to view this record")
-    
+    await require_patient_access(nurse, record["patient_id"])
+    patient = await db.patients.find_one({"id": record["patient_id"]}, {"_id": 0, "full_name": 1}) or {}
     record["patient_name"] = patient.get("full_name", "Unknown")
     return UnableToContactResponse(**record)
 
 @api_router.delete("/unable-to-contact/{record_id}")
 async def delete_unable_to_contact(record_id: str, nurse: dict = Depends(get_current_nurse)):
-    result = await db.unable_to_contact.delete_one({"id": record_id, "nurse_id": nurse["id"]})
-    if result.deleted_count == 0:
+    record = await db.unable_to_contact.find_one_and_delete({"id": record_id, "nurse_id": nurse["id"]}, {"_id": 0, "patient_id": 1})
+    if not record:
         raise HTTPException(status_code=404, detail="Record not found")
+    await refresh_activity_summaries([record["patient_id"]])
+    await record_deletion("unable_to_contact", record_id, record["patient_id"])
     return {"message": "Record deleted successfully"}
 
 # ==================== INTERVENTION ENDPOINTS ====================
 @api_router.post("/interventions", response_model=InterventionResponse)
 async def create_intervention(data: InterventionCreate, nurse: dict = Depends(get_current_nurse)):
-    # Verify patient exists and belongs to nurse
-    patient = await db.patients.find_one({"id": data.patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    await require_patient_access(nurse, data.patient_id)
+    patient = await db.patients.find_one({"id": data.patient_id}, {"_id": 0, "full_name": 1, "permanent_info.date_of_birth": 1}) or {}
     
-    intervention_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
+    # Store every submitted field; the post-intervention observations and
+    # additional comments were previously accepted but dropped
     intervention_doc = {
-        "id": intervention_id,
-        "patient_id": data.patient_id,
+        **data.model_dump(),
+        "id": str(uuid.uuid4()),
         "nurse_id": nurse["id"],
-        "intervention_date": data.intervention_date,
-        "location": data.location,
-        "body_temperature": data.body_temperature,
-        "mood_scale": data.mood_scale,
-        "intervention_type": data.intervention_type,
-        "injection_details": data.injection_details.model_dump() if data.injection_details else None,
-        "test_details": data.test_details.model_dump() if data.test_details else None,
-        "treatment_details": data.treatment_details.model_dump() if data.treatment_details else None,
-        "procedure_details": data.procedure_details.model_dump() if data.procedure_details else None,
-        "verified_patient_identity": data.verified_patient_identity,
-        "donned_proper_ppe": data.donned_proper_ppe,
-        "notes": data.notes,
-        "created_at": now
+        "intervention_date": to_bson_date(data.intervention_date),
+        "created_at": now,
+        "updated_at": now
     }
     await db.interventions.insert_one(intervention_doc)
+    intervention_doc.pop("_id", None)
+    await index_clinical_notes("intervention", [intervention_doc])
     
     return InterventionResponse(
-        id=intervention_id,
-        patient_id=data.patient_id,
+        **intervention_doc,
         patient_name=patient.get("full_name"),
-        patient_dob=patient.get("permanent_info", {}).get("date_of_birth"),
-        nurse_id=nurse["id"],
-        intervention_date=data.intervention_date,
-        location=data.location,
-        body_temperature=data.body_temperature,
-        mood_scale=data.mood_scale,
-        intervention_type=data.intervention_type,
-        injection_details=data.injection_details.model_dump() if data.injection_details else None,
-        test_details=data.test_details.model_dump() if data.test_details else None,
-        treatment_details=data.treatment_details.model_dump() if data.treatment_details else None,
-        procedure_details=data.procedure_details.model_dump() if data.procedure_details else None,
-        verified_patient_identity=data.verified_patient_identity,
-        donned_proper_ppe=data.donned_proper_ppe,
-        notes=data.notes,
-        created_at=now
+        patient_dob=patient.get("permanent_info", {}).get("date_of_birth")
     )
 
-@api_router.get("/patients/{patient_id}/interventions", response_model=List[InterventionResponse])
-async def list_interventions(patient_id: str, nurse: dict = Depends(get_current_nurse)):
-    patient = await db.patients.find_one({"id": patient_id, "nurse_id": nurse["id"]})
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+@api_router.get("/patients/{patient_id}/interventions", response_model=Page[InterventionResponse])
+async def list_interventions(
+    patient_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    await require_patient_access(nurse, patient_id)
     
-    interventions = await db.interventions.find({"patient_id": patient_id}, {"_id": 0}).sort("intervention_date", -1).to_list(1000)
+    patient = await db.patients.find_one({"id": patient_id}, {"_id": 0, "full_name": 1, "permanent_info.date_of_birth": 1}) or {}
+    interventions, next_cursor = await fetch_page(db.interventions, {"patient_id": patient_id}, "intervention_date", DESCENDING, limit, cursor)
     for i in interventions:
         i["patient_name"] = patient.get("full_name")
         i["patient_dob"] = patient.get("permanent_info", {}).get("date_of_birth")
-    return [InterventionResponse(**i) for i in interventions]
+    return typed_response(Page[InterventionResponse], {"items": interventions, "next_cursor": next_cursor})
 
 @api_router.get("/interventions/{intervention_id}", response_model=InterventionResponse)
 async def get_intervention(intervention_id: str, nurse: dict = Depends(get_current_nurse)):
@@ -1238,11 +2776,283 @@ async def get_intervention(intervention_id: str, nurse: dict = Depends(get_curre
 
 @api_router.delete("/interventions/{intervention_id}")
 async def delete_intervention(intervention_id: str, nurse: dict = Depends(get_current_nurse)):
-    result = await db.interventions.delete_one({"id": intervention_id, "nurse_id": nurse["id"]})
-    if result.deleted_count == 0:
+    intervention = await db.interventions.find_one_and_delete({"id": intervention_id, "nurse_id": nurse["id"]}, {"_id": 0, "patient_id": 1})
+    if not intervention:
         raise HTTPException(status_code=404, detail="Intervention not found")
+    await unindex_clinical_notes("intervention", [intervention_id])
+    await record_deletion("interventions", intervention_id, intervention["patient_id"])
     return {"message": "Intervention deleted successfully"}
 
+# ==================== ATTACHMENTS ====================
+# Visit and incident attachments are stored in the "attachments" GridFS bucket.
+# Uploads write GridFS chunks directly so they can be resumed: the client PUTs
+# byte ranges starting at metadata.uploaded, which only ever advances by whole
+# chunks (or to the end of the file). Downloads stream chunk by chunk and
+# honour single HTTP Range requests, so memory use never depends on file size.
+ATTACHMENT_CHUNK_SIZE = 255 * 1024  # GridFS default
+ATTACHMENT_MAX_BYTES = int(os.environ.get('ATTACHMENT_MAX_BYTES', str(50 * 1024 * 1024)))
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_MAX_SOURCE_BYTES = 30 * 1024 * 1024
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', '2'))
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class AttachmentCreate(BaseModel):
+    filename: str
+    content_type: str = "application/octet-stream"
+    length: int = Field(ge=0)
+    patient_id: Optional[str] = None
+
+class AttachmentResponse(BaseModel):
+    id: str
+    filename: str
+    content_type: str
+    length: int
+    chunk_size: int
+    uploaded: int  # Bytes stored so far; resume the upload from here
+    status: str  # uploading, complete
+    thumbnail_status: Optional[str] = None  # pending, ready, failed (images only)
+    patient_id: Optional[str] = None
+    nurse_id: str
+    created_at: str
+
+def attachment_response(doc: dict) -> dict:
+    meta = doc["metadata"]
+    return {
+        "id": doc["_id"],
+        "filename": doc["filename"],
+        "content_type": meta["content_type"],
+        "length": doc["length"],
+        "chunk_size": doc["chunkSize"],
+        "uploaded": meta["uploaded"],
+        "status": meta["status"],
+        "thumbnail_status": meta.get("thumbnail_status"),
+        "patient_id": meta.get("patient_id"),
+        "nurse_id": meta["nurse_id"],
+        "created_at": meta["created_at"]
+    }
+
+async def get_attachment_doc(attachment_id: str, nurse: dict) -> dict:
+    doc = await db["attachments.files"].find_one({"_id": attachment_id}, {"metadata.thumbnail": 0})
+    if not doc or (doc["metadata"]["nurse_id"] != nurse["id"] and not nurse.get("is_admin")):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return doc
+
+# Thumbnails are decoded in worker processes so large photos never block the event loop.
+# Workers are spawned, not forked: forking copies pymongo's background threads'
+# locks mid-state, which can deadlock the child.
+thumbnail_executor: Optional[ProcessPoolExecutor] = None
+thumbnail_tasks = {}  # attachment id -> running task
+
+def render_thumbnail(data: bytes, size: Tuple[int, int]) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", size)  # Lets JPEG decode at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size)
+        output = io.BytesIO()
+        image.convert("RGB").save(output, "JPEG", quality=80)
+        return output.getvalue()
+
+async def generate_thumbnail(attachment_id: str):
+    global thumbnail_executor
+    if thumbnail_executor is None:
+        thumbnail_executor = ProcessPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    try:
+        data = b"".join([
+            chunk["data"] async for chunk in
+            db["attachments.chunks"].find({"files_id": attachment_id}, {"_id": 0, "data": 1}).sort("n", 1)
+        ])
+        thumbnail = await asyncio.get_running_loop().run_in_executor(
+            thumbnail_executor, render_thumbnail, data, THUMBNAIL_SIZE
+        )
+        update = {"metadata.thumbnail": thumbnail, "metadata.thumbnail_status": "ready"}
+    except Exception as e:
+        logger.warning(f"Thumbnail generation failed for attachment {attachment_id}: {e}")
+        update = {"metadata.thumbnail_status": "failed"}
+    await db["attachments.files"].update_one({"_id": attachment_id}, {"$set": update})
+
+def schedule_thumbnail(attachment_id: str):
+    if attachment_id in thumbnail_tasks:
+        return
+    task = asyncio.create_task(generate_thumbnail(attachment_id))
+    thumbnail_tasks[attachment_id] = task
+    task.add_done_callback(lambda _: thumbnail_tasks.pop(attachment_id, None))
+
+@api_router.post("/attachments", response_model=AttachmentResponse)
+async def create_attachment(data: AttachmentCreate, nurse: dict = Depends(get_current_nurse)):
+    """Start an upload; send the bytes with PUT /attachments/{id}/content"""
+    if data.length > ATTACHMENT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Attachments are limited to {ATTACHMENT_MAX_BYTES} bytes")
+    if data.patient_id:
+        await require_patient_access(nurse, data.patient_id)
+    
+    doc = {
+        "_id": str(uuid.uuid4()),
+        "filename": data.filename,
+        "length": data.length,
+        "chunkSize": ATTACHMENT_CHUNK_SIZE,
+        "metadata": {
+            "content_type": data.content_type,
+            "patient_id": data.patient_id,
+            "nurse_id": nurse["id"],
+            "uploaded": 0,
+            "status": "uploading",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+    }
+    await db["attachments.files"].insert_one(doc)
+    if data.length == 0:
+        doc = await finish_attachment_upload(doc)
+    return typed_response(AttachmentResponse, attachment_response(doc))
+
+async def finish_attachment_upload(doc: dict) -> dict:
+    meta = doc["metadata"]
+    meta["status"] = "complete"
+    meta["uploaded"] = doc["length"]
+    is_image = meta["content_type"].startswith("image/") and 0 < doc["length"] <= THUMBNAIL_MAX_SOURCE_BYTES
+    if is_image:
+        meta["thumbnail_status"] = "pending"
+    doc["uploadDate"] = datetime.now(timezone.utc)
+    await db["attachments.files"].update_one({"_id": doc["_id"]}, {"$set": {
+        "uploadDate": doc["uploadDate"],
+        "metadata.status": "complete",
+        "metadata.uploaded": doc["length"],
+        "metadata.thumbnail_status": meta.get("thumbnail_status")
+    }})
+    if is_image:
+        schedule_thumbnail(doc["_id"])
+    return doc
+
+@api_router.put("/attachments/{attachment_id}/content", response_model=AttachmentResponse)
+async def upload_attachment_content(attachment_id: str, request: Request, nurse: dict = Depends(get_current_nurse)):
+    """
+    Append bytes to an upload. Send Content-Range: bytes start-end/length with
+    start at or before the attachment's uploaded offset and on a chunk
+    boundary. A trailing partial chunk is only kept if it ends the file;
+    otherwise the response's uploaded offset tells the client where to resume.
+    """
+    doc = await get_attachment_doc(attachment_id, nurse)
+    meta = doc["metadata"]
+    if meta["status"] == "complete":
+        return typed_response(AttachmentResponse, attachment_response(doc))
+    
+    chunk_size = doc["chunkSize"]
+    content_range = request.headers.get("content-range")
+    start = 0
+    if content_range:
+        match = CONTENT_RANGE_PATTERN.match(content_range)
+        if not match or int(match.group(3)) != doc["length"]:
+            raise HTTPException(status_code=400, detail="Content-Range must be bytes start-end/length")
+        start = int(match.group(1))
+    if start > meta["uploaded"] or start % chunk_size:
+        raise HTTPException(status_code=409, detail=f"Resume the upload from byte {meta['uploaded']}")
+    
+    position = start
+    buffer = bytearray()
+    async for piece in request.stream():
+        buffer += piece
+        if position + len(buffer) > doc["length"]:
+            raise HTTPException(status_code=400, detail="Upload is longer than the declared length")
+        while len(buffer) >= chunk_size:
+            await db["attachments.chunks"].replace_one(
+                {"files_id": attachment_id, "n": position // chunk_size},
+                {"files_id": attachment_id, "n": position // chunk_size, "data": bytes(buffer[:chunk_size])},
+                upsert=True
+            )
+            del buffer[:chunk_size]
+            position += chunk_size
+            await db["attachments.files"].update_one({"_id": attachment_id}, {"$max": {"metadata.uploaded": position}})
+    
+    if buffer and position + len(buffer) == doc["length"]:
+        await db["attachments.chunks"].replace_one(
+            {"files_id": attachment_id, "n": position // chunk_size},
+            {"files_id": attachment_id, "n": position // chunk_size, "data": bytes(buffer)},
+            upsert=True
+        )
+        position = doc["length"]
+    
+    meta["uploaded"] = max(meta["uploaded"], position)
+    if meta["uploaded"] == doc["length"]:
+        doc = await finish_attachment_upload(doc)
+    return typed_response(AttachmentResponse, attachment_response(doc))
+
+@api_router.get("/attachments/{attachment_id}", response_model=AttachmentResponse)
+async def get_attachment(attachment_id: str, nurse: dict = Depends(get_current_nurse)):
+    return typed_response(AttachmentResponse, attachment_response(await get_attachment_doc(attachment_id, nurse)))
+
+def parse_range(header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single bytes range, or None to send the whole file"""
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None  # Multiple or malformed ranges: serve the full content
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), length - 1) if match.group(2) else length - 1
+    else:
+        start = max(length - int(match.group(2)), 0)
+        end = length - 1
+    if start > end or start >= length:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{length}"})
+    return start, end
+
+async def stream_attachment(attachment_id: str, chunk_size: int, start: int, end: int):
+    first, last = start // chunk_size, end // chunk_size
+    cursor = db["attachments.chunks"].find(
+        {"files_id": attachment_id, "n": {"$gte": first, "$lte": last}},
+        {"_id": 0, "n": 1, "data": 1}
+    ).sort("n", 1).batch_size(8)
+    async for chunk in cursor:
+        offset = chunk["n"] * chunk_size
+        yield chunk["data"][max(start - offset, 0):end - offset + 1]
+
+@api_router.get("/attachments/{attachment_id}/content")
+async def download_attachment(attachment_id: str, request: Request, nurse: dict = Depends(get_current_nurse)):
+    doc = await get_attachment_doc(attachment_id, nurse)
+    if doc["metadata"]["status"] != "complete":
+        raise HTTPException(status_code=409, detail="Upload is not complete")
+    
+    length = doc["length"]
+    filename = doc["filename"].replace('"', "")
+    headers = {"Accept-Ranges": "bytes", "Content-Disposition": f'inline; filename="{filename}"'}
+    byte_range = parse_range(request.headers.get("range"), length) if length else None
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+        status_code = 206
+    else:
+        start, end = 0, length - 1
+        status_code = 200
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        stream_attachment(attachment_id, doc["chunkSize"], start, end),
+        status_code=status_code,
+        media_type=doc["metadata"]["content_type"],
+        headers=headers
+    )
+
+@api_router.get("/attachments/{attachment_id}/thumbnail")
+async def get_attachment_thumbnail(attachment_id: str, nurse: dict = Depends(get_current_nurse)):
+    doc = await get_attachment_doc(attachment_id, nurse)
+    if doc["metadata"].get("thumbnail_status") != "ready":
+        if doc["metadata"].get("thumbnail_status") == "pending":
+            # Restarts the job if the process that scheduled it went away before finishing
+            schedule_thumbnail(attachment_id)
+        raise HTTPException(status_code=404, detail="Thumbnail not available")
+    thumbnail = await db["attachments.files"].find_one({"_id": attachment_id}, {"_id": 0, "metadata.thumbnail": 1})
+    return Response(content=thumbnail["metadata"]["thumbnail"], media_type="image/jpeg")
+
+@api_router.delete("/attachments/{attachment_id}")
+async def delete_attachment(attachment_id: str, nurse: dict = Depends(get_current_nurse)):
+    await get_attachment_doc(attachment_id, nurse)
+    await db["attachments.chunks"].delete_many({"files_id": attachment_id})
+    await db["attachments.files"].delete_one({"_id": attachment_id})
+    return {"message": "Attachment deleted successfully"}
+
 # ==================== MONTHLY REPORTS ====================
 class MonthlyReportRequest(BaseModel):
     year: int
@@ -1250,6 +3060,35 @@ class MonthlyReportRequest(BaseModel):
     patient_id: Optional[str] = None  # Optional: filter by specific patient
     organization: Optional[str] = None  # Optional: filter by organization
     visit_type: Optional[str] = None  # Optional: filter by visit type (daily_note, vitals_only)
+    include_visits: bool = False  # Return full visit documents alongside the summary
+
+REPORT_VISIT_TYPES = ("nurse_visit", "vitals_only", "daily_note")
+
+# Computes every summary figure on the server in one pass over the matched visits.
+# Unknown visit types count as nurse visits and blank organizations as "Unspecified".
+MONTHLY_REPORT_FACETS = {"$facet": {
+    "total": [{"$count": "count"}],
+    "by_type": [{"$group": {
+        "_id": {"$cond": [
+            {"$in": [{"$ifNull": ["$visit_type", "nurse_visit"]}, list(REPORT_VISIT_TYPES)]},
+            {"$ifNull": ["$visit_type", "nurse_visit"]},
+            "nurse_visit"
+        ]},
+        "count": {"$sum": 1}
+    }}],
+    "by_organization": [{"$group": {
+        "_id": {"$cond": [
+            {"$eq": [{"$ifNull": ["$organization", ""]}, ""]},
+            "Unspecified",
+            "$organization"
+        ]},
+        "count": {"$sum": 1}
+    }}],
+    "unique_patients": [
+        {"$group": {"_id": "$patient_id"}},
+        {"$count": "count"}
+    ]
+}}
 
 @api_router.post("/reports/monthly")
 async def get_monthly_report(data: MonthlyReportRequest, nurse: dict = Depends(get_current_nurse)):
@@ -1263,13 +3102,14 @@ async def get_monthly_report(data: MonthlyReportRequest, nurse: dict = Depends(g
     
     # Check if it's current month - use today's date as end
     today = date.today()
-    if data.year == today.year and data.month == today.month:
+    current_month = data.year == today.year and data.month == today.month
+    if current_month:
         end_date = today.isoformat()
     
     # Build query
     query = {
         "nurse_id": nurse["id"],
-        "visit_date": {"$gte": start_date, "$lte": end_date + "T23:59:59"}
+        "visit_date": day_range(start_date, end_date)
     }
     
     if data.patient_id:
@@ -1281,53 +3121,1178 @@ async def get_monthly_report(data: MonthlyReportRequest, nurse: dict = Depends(g
     if data.visit_type:
         query["visit_type"] = data.visit_type
     
-    # Get visits
-    visits = await db.visits.find(query, {"_id": 0}).sort("visit_date", 1).to_list(10000)
-    
-    # Get patient info for each visit
-    patient_ids = list(set(v["patient_id"] for v in visits))
-    patients = await db.patients.find({"id": {"$in": patient_ids}}, {"_id": 0}).to_list(1000)
-    patient_map = {p["id"]: p for p in patients}
-    
-    # Group visits by type
-    visits_by_type = {
-        "nurse_visit": [],
-        "vitals_only": [],
-        "daily_note": []
-    }
+    period = f"{data.year}-{data.month:02d}"
+    if not data.include_visits and not current_month and await rollups_built():
+        # Summary-only requests for closed months are answered from the
+        # incrementally maintained rollups. Rollups count whole months, so the
+        # current month (which ends today) is summarized from the visits below,
+        # keeping future-dated visits out of both paths alike. Until the first
+        # rebuild has backfilled them, every month comes from the visits.
+        summary = {
+            "period": period,
+            "start_date": start_date,
+            "end_date": end_date,
+            **await summarize_from_rollups(
+                nurse["id"], period,
+                patient_id=data.patient_id,
+                organization=data.organization,
+                visit_type=data.visit_type
+            )
+        }
+        return {"summary": summary}
     
-    for visit in visits:
-        visit_type = visit.get("visit_type", "nurse_visit")
-        visit["patient_name"] = patient_map.get(visit["patient_id"], {}).get("full_name", "Unknown")
-        if visit_type in visits_by_type:
-            visits_by_type[visit_type].append(visit)
-        else:
-            visits_by_type["nurse_visit"].append(visit)
+    facets = (await db.visits.aggregate([{"$match": query}, MONTHLY_REPORT_FACETS]).to_list(1))[0]
+    by_type = {t["_id"]: t["count"] for t in facets["by_type"]}
     
     # Summary stats
     summary = {
-        "period": f"{data.year}-{data.month:02d}",
+        "period": period,
         "start_date": start_date,
         "end_date": end_date,
-        "total_visits": len(visits),
-        "nurse_visits": len(visits_by_type["nurse_visit"]),
-        "vitals_only": len(visits_by_type["vitals_only"]),
-        "daily_notes": len(visits_by_type["daily_note"]),
-        "unique_patients": len(patient_ids),
-        "by_organization": {}
+        "total_visits": facets["total"][0]["count"] if facets["total"] else 0,
+        "nurse_visits": by_type.get("nurse_visit", 0),
+        "vitals_only": by_type.get("vitals_only", 0),
+        "daily_notes": by_type.get("daily_note", 0),
+        "unique_patients": facets["unique_patients"][0]["count"] if facets["unique_patients"] else 0,
+        "by_organization": {o["_id"]: o["count"] for o in facets["by_organization"]}
     }
+    if not data.include_visits:
+        return {"summary": summary}
+    
+    visits = await db.visits.find(query, {"_id": 0}).sort("visit_date", 1).to_list(None)
     
-    # Count by organization
+    # Get patient names for the returned visits
+    patient_ids = list(set(v["patient_id"] for v in visits))
+    patients = await db.patients.find({"id": {"$in": patient_ids}}, {"_id": 0, "id": 1, "full_name": 1}).to_list(None)
+    patient_names = {p["id"]: p.get("full_name", "Unknown") for p in patients}
+    
+    # Group visits by type
+    visits_by_type = {visit_type: [] for visit_type in REPORT_VISIT_TYPES}
     for visit in visits:
-        org = visit.get("organization") or "Unspecified"
-        summary["by_organization"][org] = summary["by_organization"].get(org, 0) + 1
+        expand_visit(visit)
+        visit_type = visit.get("visit_type", "nurse_visit")
+        visit["visit_date"] = from_bson_date(visit["visit_date"])
+        visit["patient_name"] = patient_names.get(visit["patient_id"], "Unknown")
+        visits_by_type[visit_type if visit_type in visits_by_type else "nurse_visit"].append(visit)
     
-    return {
+    # Untyped payload of up to a month of full visits: skip jsonable_encoder's recursive walk
+    return FastJSONResponse({
         "summary": summary,
         "visits": visits,
         "visits_by_type": visits_by_type
+    })
+
+# ==================== VISIT EXPORT ====================
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_BASE_COLUMNS = [
+    "id", "visit_date", "visit_type", "status", "organization", "patient_id", "patient_name",
+    "nurse_id", "overall_health_status", "nurse_notes", "daily_note_content",
+    "screening_completed_by", "reviewed_and_signed_by", "attachments", "created_at"
+]
+
+
+def _model_columns(model, prefix: str) -> List[str]:
+    """Dotted CSV columns for a section model; str-or-model fields get both forms"""
+    columns = []
+    for name, field in model.model_fields.items():
+        column = f"{prefix}.{name}"
+        nested = [arg for arg in get_args(field.annotation) if isinstance(arg, type) and issubclass(arg, BaseModel)]
+        columns.append(column)
+        for sub_model in nested:
+            columns.extend(_model_columns(sub_model, column))
+    return columns
+
+EXPORT_COLUMNS = EXPORT_BASE_COLUMNS + [
+    column for section, model in VISIT_SECTIONS for column in _model_columns(model, section)
+]
+
+def flatten_visit(visit: dict, prefix: str = "") -> dict:
+    row = {}
+    for key, value in visit.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten_visit(value, f"{column}."))
+        elif isinstance(value, list):
+            row[column] = ";".join(str(item) for item in value)
+        else:
+            row[column] = value
+    return row
+
+async def stream_visit_export(query: dict, export_format: str):
+    """Yield the export in chunks of EXPORT_BATCH_SIZE visits straight off the cursor"""
+    patient_names = {}
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    cursor = db.visits.find(query, {"_id": 0}).sort([("visit_date", 1), ("id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+    batch = []
+    async for visit in cursor:
+        batch.append(visit)
+        if len(batch) < EXPORT_BATCH_SIZE:
+            continue
+        yield await _render_export_batch(batch, export_format, patient_names, writer, buffer)
+        batch = []
+    if batch:
+        yield await _render_export_batch(batch, export_format, patient_names, writer, buffer)
+
+async def _render_export_batch(batch: List[dict], export_format: str, patient_names: dict, writer, buffer) -> str:
+    missing = list({v["patient_id"] for v in batch} - patient_names.keys())
+    if missing:
+        async for p in db.patients.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "full_name": 1}):
+            patient_names[p["id"]] = p.get("full_name")
+    
+    for visit in batch:
+        expand_visit(visit)
+        visit["visit_date"] = from_bson_date(visit["visit_date"])
+        visit["patient_name"] = patient_names.get(visit["patient_id"], "Unknown")
+        if writer:
+            writer.writerow(flatten_visit(visit))
+        else:
+            buffer.write(json.dumps(visit, default=str))
+            buffer.write("\n")
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+@api_router.get("/reports/export")
+async def export_visits(
+    start_date: str,
+    end_date: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    nurse_id: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Stream every visit between start_date and end_date (inclusive, YYYY-MM-DD)
+    as CSV or NDJSON. Admins export all nurses (optionally one nurse_id),
+    other staff export their own visits.
+    """
+    query = {"visit_date": day_range(start_date, end_date)}
+    if not nurse.get("is_admin"):
+        query["nurse_id"] = nurse["id"]
+    elif nurse_id:
+        query["nurse_id"] = nurse_id
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"visits_{start_date}_{end_date}.{format}"
+    return StreamingResponse(
+        stream_visit_export(query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# ==================== MONTHLY ROLLUPS ====================
+# monthly_rollups holds one document per (nurse, organization, month, visit_type)
+# with the visit count and a per-patient visit count map. Visit writes keep it
+# current with $inc so summary reports never have to scan raw visits. The
+# collection is only complete once rebuild_monthly_rollups has run against the
+# existing visits; it then marks meta {"_id": "monthly_rollups"}, and reports
+# use the visits until that marker exists.
+ROLLUPS_META_ID = "monthly_rollups"
+rollups_state = {"built": False}
+
+async def rollups_built() -> bool:
+    """Whether the rollups cover every visit; once true on a worker it stays true"""
+    if not rollups_state["built"]:
+        rollups_state["built"] = await db.meta.find_one({"_id": ROLLUPS_META_ID, "built_at": {"$exists": True}}, {"_id": 1}) is not None
+    return rollups_state["built"]
+
+def rollup_key(visit: dict) -> dict:
+    return {
+        "nurse_id": visit["nurse_id"],
+        "month": to_bson_date(visit["visit_date"]).strftime("%Y-%m"),
+        "organization": visit.get("organization"),
+        "visit_type": visit.get("visit_type", "nurse_visit")
+    }
+
+def rollup_delta(visit: dict, delta: int) -> UpdateOne:
+    return UpdateOne(
+        rollup_key(visit),
+        {"$inc": {"count": delta, f"patients.{visit['patient_id']}": delta}},
+        upsert=True
+    )
+
+async def update_monthly_rollups(removed: Optional[dict] = None, added: Optional[dict] = None):
+    """Move a visit between rollup buckets. Pass the old document, the new one, or both."""
+    if removed and added and rollup_key(removed) == rollup_key(added):
+        return
+    ops = []
+    if removed:
+        ops.append(rollup_delta(removed, -1))
+    if added:
+        ops.append(rollup_delta(added, 1))
+    if ops:
+        await db.monthly_rollups.bulk_write(ops, ordered=True)
+
+async def remove_patient_from_rollups(patient_id: str):
+    """Subtract all of a patient's visits from the rollups before they are deleted"""
+    buckets = await db.visits.aggregate([
+        {"$match": {"patient_id": patient_id}},
+        {"$group": {
+            "_id": {
+                "nurse_id": "$nurse_id",
+                # $toDate: string visit_dates remain until migrate-dates has finished
+                "month": {"$dateToString": {"format": "%Y-%m", "date": {"$toDate": "$visit_date"}}},
+                "organization": "$organization",
+                "visit_type": {"$ifNull": ["$visit_type", "nurse_visit"]}
+            },
+            "count": {"$sum": 1}
+        }}
+    ]).to_list(None)
+    ops = [
+        UpdateOne(
+            {"nurse_id": b["_id"]["nurse_id"], "month": b["_id"]["month"],
+             "organization": b["_id"].get("organization"), "visit_type": b["_id"]["visit_type"]},
+            {"$inc": {"count": -b["count"]}, "$unset": {f"patients.{patient_id}": ""}}
+        )
+        for b in buckets
+    ]
+    if ops:
+        await db.monthly_rollups.bulk_write(ops, ordered=False)
+
+async def rebuild_monthly_rollups() -> int:
+    """Recompute every rollup from the raw visits and replace the collection"""
+    await db.visits.aggregate([
+        {"$group": {
+            "_id": {
+                "nurse_id": "$nurse_id",
+                # $toDate: string visit_dates remain until migrate-dates has finished
+                "month": {"$dateToString": {"format": "%Y-%m", "date": {"$toDate": "$visit_date"}}},
+                "organization": "$organization",
+                "visit_type": {"$ifNull": ["$visit_type", "nurse_visit"]},
+                "patient_id": "$patient_id"
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$group": {
+            "_id": {
+                "nurse_id": "$_id.nurse_id",
+                "month": "$_id.month",
+                "organization": "$_id.organization",
+                "visit_type": "$_id.visit_type"
+            },
+            "count": {"$sum": "$count"},
+            "patients": {"$push": {"k": "$_id.patient_id", "v": "$count"}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "nurse_id": "$_id.nurse_id",
+            "month": "$_id.month",
+            "organization": "$_id.organization",
+            "visit_type": "$_id.visit_type",
+            "count": 1,
+            "patients": {"$arrayToObject": "$patients"}
+        }},
+        {"$out": "monthly_rollups"}
+    ]).to_list(None)
+    await db.meta.update_one(
+        {"_id": ROLLUPS_META_ID},
+        {"$set": {"built_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True
+    )
+    rollups_state["built"] = True
+    return await db.monthly_rollups.count_documents({})
+
+async def summarize_from_rollups(nurse_id: str, month: str, patient_id: Optional[str] = None,
+                                 organization: Optional[str] = None, visit_type: Optional[str] = None) -> dict:
+    query = {"nurse_id": nurse_id, "month": month}
+    if organization:
+        query["organization"] = organization
+    if visit_type:
+        query["visit_type"] = visit_type
+    if patient_id:
+        query[f"patients.{patient_id}"] = {"$gt": 0}
+    
+    total = 0
+    by_type = {}
+    by_organization = {}
+    patients = set()
+    async for rollup in db.monthly_rollups.find(query, {"_id": 0}):
+        counts = {pid: n for pid, n in (rollup.get("patients") or {}).items() if n > 0}
+        if patient_id:
+            counts = {patient_id: counts.get(patient_id, 0)}
+        count = sum(counts.values())
+        if not count:
+            continue
+        total += count
+        patients.update(counts)
+        rollup_type = rollup.get("visit_type")
+        rollup_type = rollup_type if rollup_type in REPORT_VISIT_TYPES else "nurse_visit"
+        by_type[rollup_type] = by_type.get(rollup_type, 0) + count
+        org = rollup.get("organization") or "Unspecified"
+        by_organization[org] = by_organization.get(org, 0) + count
+    return {
+        "total_visits": total,
+        "nurse_visits": by_type.get("nurse_visit", 0),
+        "vitals_only": by_type.get("vitals_only", 0),
+        "daily_notes": by_type.get("daily_note", 0),
+        "unique_patients": len(patients),
+        "by_organization": by_organization
+    }
+
+@api_router.post("/admin/maintenance/rebuild-monthly-rollups")
+async def rebuild_monthly_rollups_endpoint(nurse: dict = Depends(get_current_nurse)):
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    rollups = await rebuild_monthly_rollups()
+    return {"message": "Monthly rollups rebuilt", "rollups": rollups}
+
+# ==================== VITALS SERIES ====================
+# vitals_series holds one small numeric document per completed visit with
+# vitals, parsed once from the free-text vital_signs when the visit is written.
+# Trend queries read only this collection and aggregate with NumPy.
+VITAL_METRICS = {
+    "weight": "weight",
+    "temperature": "body_temperature",
+    "systolic": "blood_pressure_systolic",
+    "diastolic": "blood_pressure_diastolic",
+    "pulse": "pulse",
+    "spo2": "pulse_oximeter",
+    "respirations": "respirations",
+}
+NUMBER_PATTERN = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+def parse_vital(value) -> Optional[float]:
+    """First number in a free-text reading ("98.6 F", "150lbs", "97%"), or None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = NUMBER_PATTERN.search(value)
+    return float(match.group()) if match else None
+
+def vitals_point(visit: dict) -> Optional[dict]:
+    if visit.get("status", "completed") != "completed":
+        return None
+    vital_signs = visit.get("vital_signs") or {}
+    point = {
+        metric: number for metric, field in VITAL_METRICS.items()
+        if (number := parse_vital(vital_signs.get(field))) is not None
+    }
+    if not point and not vital_signs.get("bp_abnormal"):
+        return None
+    return {
+        "visit_id": visit["id"],
+        "patient_id": visit["patient_id"],
+        "visit_date": to_bson_date(visit["visit_date"]),
+        "bp_abnormal": bool(vital_signs.get("bp_abnormal")),
+        **point
+    }
+
+def vitals_series_op(visit: dict):
+    point = vitals_point(visit)
+    if point is None:
+        return DeleteOne({"visit_id": visit["id"]})
+    return ReplaceOne({"visit_id": visit["id"]}, point, upsert=True)
+
+async def sync_vitals_series(visits: List[dict]):
+    """Upsert (or drop) the series points of visits that were just written"""
+    if visits:
+        await db.vitals_series.bulk_write([vitals_series_op(v) for v in visits], ordered=False)
+
+async def rebuild_vitals_series(batch_size: int = 1000) -> int:
+    """Backfill the series from every stored visit"""
+    written = 0
+    ops = []
+    projection = {"_id": 0, "id": 1, "patient_id": 1, "visit_date": 1, "status": 1, "vital_signs": 1}
+    async for visit in db.visits.find({}, projection).batch_size(batch_size):
+        try:
+            ops.append(vitals_series_op(visit))
+        except ValueError:
+            logger.warning(f"Visit {visit.get('id')} has an unparseable visit_date, skipped from vitals series")
+            continue
+        if len(ops) >= batch_size:
+            await db.vitals_series.bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        await db.vitals_series.bulk_write(ops, ordered=False)
+        written += len(ops)
+    return written
+
+def rolling_mean(days: np.ndarray, values: np.ndarray, window_days: float) -> np.ndarray:
+    """Mean of the readings in the window_days ending at each reading, ignoring gaps (NaN)"""
+    present = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    left = np.searchsorted(days, days - window_days, side="right")
+    right = np.arange(1, len(days) + 1)
+    n = counts[right] - counts[left]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, (sums[right] - sums[left]) / n, np.nan)
+
+def rolling_count(days: np.ndarray, flags: np.ndarray, window_days: float) -> np.ndarray:
+    """Number of flagged readings in the window_days ending at each reading"""
+    counts = np.concatenate(([0], np.cumsum(flags)))
+    left = np.searchsorted(days, days - window_days, side="right")
+    right = np.arange(1, len(days) + 1)
+    return counts[right] - counts[left]
+
+def _float_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+class VitalMetricTrend(BaseModel):
+    values: List[Optional[float]]  # Aligned with VitalsTrend.dates; null where not recorded
+    rolling_mean: List[Optional[float]]
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    latest: Optional[float] = None
+    slope_per_day: Optional[float] = None  # Least-squares slope over the whole range
+
+class VitalsTrend(BaseModel):
+    patient_id: str
+    start_date: str
+    end_date: str
+    window_days: int
+    dates: List[DateString]
+    bp_abnormal_count: int
+    bp_abnormal_rolling: List[int]  # abnormal BP readings in the window ending at each date
+    metrics: dict[str, VitalMetricTrend]
+
+def metric_trend(days: np.ndarray, values: np.ndarray, window_days: int) -> dict:
+    present = ~np.isnan(values)
+    count = int(present.sum())
+    trend = {
+        "values": _float_list(values),
+        "rolling_mean": _float_list(rolling_mean(days, values, window_days)),
+        "count": count
+    }
+    if count:
+        observed = values[present]
+        trend.update(
+            min=_optional_float(observed.min()),
+            max=_optional_float(observed.max()),
+            mean=_optional_float(observed.mean()),
+            latest=_optional_float(observed[-1])
+        )
+        if count >= 2 and np.ptp(days[present]) > 0:
+            trend["slope_per_day"] = _optional_float(np.polyfit(days[present], observed, 1)[0])
+    return trend
+
+@api_router.get("/patients/{patient_id}/vitals/trend", response_model=VitalsTrend)
+async def get_vitals_trend(
+    patient_id: str,
+    start_date: str,
+    end_date: str,
+    window_days: int = Query(30, ge=1, le=3650),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Vitals between start_date and end_date (inclusive, YYYY-MM-DD) with a
+    rolling mean over the trailing window_days, min/max/mean, the per-day
+    slope and the number of abnormal blood pressure readings, both over the
+    whole range and over the window ending at each reading.
+    """
+    await require_patient_access(nurse, patient_id)
+    
+    points = await db.vitals_series.find(
+        {"patient_id": patient_id, "visit_date": day_range(start_date, end_date)},
+        {"_id": 0, "visit_id": 0, "patient_id": 0}
+    ).sort("visit_date", 1).to_list(None)
+    
+    dates = [p["visit_date"] for p in points]
+    days = np.array([d.timestamp() for d in dates], dtype=float) / 86400.0
+    bp_abnormal = np.array([bool(p.get("bp_abnormal")) for p in points], dtype=bool)
+    return typed_response(VitalsTrend, {
+        "patient_id": patient_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "window_days": window_days,
+        "dates": dates,
+        "bp_abnormal_count": int(bp_abnormal.sum()),
+        "bp_abnormal_rolling": rolling_count(days, bp_abnormal, window_days).tolist(),
+        "metrics": {
+            metric: metric_trend(days, np.array([p.get(metric, np.nan) for p in points], dtype=float), window_days)
+            for metric in VITAL_METRICS
+        }
+    })
+
+@api_router.post("/admin/maintenance/rebuild-vitals-series")
+async def rebuild_vitals_series_endpoint(nurse: dict = Depends(get_current_nurse)):
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    written = await rebuild_vitals_series()
+    return {"message": "Vitals series rebuilt", "visits": written}
+
+# ==================== VITALS ALERTS ====================
+# A batch scan over vitals_series that flags every patient whose latest
+# readings are out of range. Readings are loaded as (patients x readings)
+# matrices, newest first, and the thresholds are evaluated column-wise with
+# NumPy. Results replace the vitals_alerts collection on every run.
+VITAL_ALERT_THRESHOLDS = {
+    "systolic_high": 140,
+    "diastolic_high": 90,
+    "systolic_low": 90,
+    "diastolic_low": 60,
+    "spo2_low": 92,
+    "fever_f": 100.4,
+}
+ALERT_METRICS = ["systolic", "diastolic", "spo2", "temperature"]
+
+class VitalsAlert(BaseModel):
+    id: str  # patient id
+    patient_name: Optional[str] = None
+    organization: Optional[str] = None
+    alerts: List[str]  # high_bp, low_bp, low_spo2, fever
+    latest: dict  # Latest value of each alert metric within the scanned readings
+    last_reading_date: Optional[DateString] = None
+    abnormal_readings: int  # Scanned readings with at least one out-of-range value
+    readings: int
+    evaluated_at: str
+
+def latest_values(matrix: np.ndarray) -> np.ndarray:
+    """Newest non-missing value per row of a newest-first matrix (NaN if none)"""
+    present = ~np.isnan(matrix)
+    latest = matrix[np.arange(matrix.shape[0]), present.argmax(axis=1)]
+    latest[~present.any(axis=1)] = np.nan
+    return latest
+
+def evaluate_vitals(columns: dict) -> Tuple[dict, np.ndarray]:
+    """Per-patient alert masks from the latest values, and abnormal counts over every reading"""
+    t = VITAL_ALERT_THRESHOLDS
+    # Readings under 50 degrees are taken to be Celsius
+    temperature = columns["temperature"]
+    columns = {**columns, "temperature": np.where(temperature < 50, temperature * 9 / 5 + 32, temperature)}
+    
+    def out_of_range(v: dict) -> dict:
+        with np.errstate(invalid="ignore"):
+            return {
+                "high_bp": (v["systolic"] >= t["systolic_high"]) | (v["diastolic"] >= t["diastolic_high"]),
+                "low_bp": (v["systolic"] < t["systolic_low"]) | (v["diastolic"] < t["diastolic_low"]),
+                "low_spo2": v["spo2"] < t["spo2_low"],
+                "fever": v["temperature"] >= t["fever_f"],
+            }
+    
+    alerts = out_of_range({metric: latest_values(matrix) for metric, matrix in columns.items()})
+    abnormal = np.logical_or.reduce(list(out_of_range(columns).values()))
+    return alerts, abnormal.sum(axis=1)
+
+async def scan_vitals_alerts(readings: int = 3) -> dict:
+    """Evaluate the latest readings of every patient and replace vitals_alerts"""
+    started = time.monotonic()
+    # Rank each patient's readings newest first and keep only the top ones, so
+    # memory grows with patients x readings rather than with total history
+    grouped = await db.vitals_series.aggregate([
+        {"$setWindowFields": {
+            "partitionBy": "$patient_id",
+            "sortBy": {"visit_date": -1},
+            "output": {"rank": {"$documentNumber": {}}}
+        }},
+        {"$match": {"rank": {"$lte": readings}}},
+        {"$group": {
+            "_id": "$patient_id",
+            "readings": {"$push": {
+                "rank": "$rank",
+                "date": "$visit_date",
+                **{metric: {"$ifNull": [f"${metric}", None]} for metric in ALERT_METRICS}
+            }}
+        }}
+    ], allowDiskUse=True).to_list(None)
+    latest = []
+    for row in grouped:
+        # $push order is not guaranteed after $group; the rank is
+        newest_first = sorted(row["readings"], key=lambda r: r["rank"])
+        latest.append({
+            "_id": row["_id"],
+            "dates": [r["date"] for r in newest_first],
+            **{metric: [r[metric] for r in newest_first] for metric in ALERT_METRICS}
+        })
+    
+    patient_ids = [row["_id"] for row in latest]
+    columns = {metric: np.full((len(latest), readings), np.nan) for metric in ALERT_METRICS}
+    counts = np.zeros(len(latest), dtype=int)
+    for i, row in enumerate(latest):
+        counts[i] = len(row["dates"])
+        for metric in ALERT_METRICS:
+            columns[metric][i, :len(row[metric])] = [np.nan if v is None else v for v in row[metric]]
+    alerts, abnormal_counts = evaluate_vitals(columns)
+    latest_by_metric = {metric: latest_values(matrix) for metric, matrix in columns.items()}
+    
+    flagged = np.flatnonzero(np.logical_or.reduce(list(alerts.values())))
+    patients = {}
+    if len(flagged):
+        async for p in db.patients.find(
+            {"id": {"$in": [patient_ids[i] for i in flagged]}},
+            {"_id": 0, "id": 1, "full_name": 1, "permanent_info.organization": 1}
+        ):
+            patients[p["id"]] = p
+    
+    run_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    ops = []
+    for i in flagged:
+        patient = patients.get(patient_ids[i], {})
+        ops.append(ReplaceOne({"id": patient_ids[i]}, {
+            "id": patient_ids[i],
+            "patient_name": patient.get("full_name"),
+            "organization": (patient.get("permanent_info") or {}).get("organization"),
+            "alerts": [name for name, mask in alerts.items() if mask[i]],
+            "latest": {
+                metric: _optional_float(values[i])
+                for metric, values in latest_by_metric.items()
+                if not np.isnan(values[i])
+            },
+            "last_reading_date": latest[i]["dates"][0],
+            "abnormal_readings": int(abnormal_counts[i]),
+            "readings": int(counts[i]),
+            "evaluated_at": now,
+            "run_id": run_id
+        }, upsert=True))
+    for start in range(0, len(ops), 1000):
+        await db.vitals_alerts.bulk_write(ops[start:start + 1000], ordered=False)
+    # Patients that are back in range drop out
+    await db.vitals_alerts.delete_many({"run_id": {"$ne": run_id}})
+    
+    return {
+        "patients_scanned": len(latest),
+        "alerts": len(ops),
+        "seconds": round(time.monotonic() - started, 3)
     }
 
+@api_router.post("/admin/maintenance/scan-vitals")
+async def scan_vitals(
+    readings: int = Query(3, ge=1, le=50),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """Rerun the abnormal-vitals scan over each patient's latest readings"""
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await scan_vitals_alerts(readings)
+
+@api_router.get("/admin/vitals-alerts", response_model=Page[VitalsAlert])
+async def list_vitals_alerts(
+    organization: Optional[str] = None,
+    alert: Optional[str] = Query(None, pattern="^(high_bp|low_bp|low_spo2|fever)$"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    nurse: dict = Depends(get_current_nurse)
+):
+    """Patients flagged by the last vitals scan, by name, optionally for one organization or alert"""
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    query = {}
+    if organization:
+        query["organization"] = organization
+    if alert:
+        query["alerts"] = alert
+    alerts, next_cursor = await fetch_page(db.vitals_alerts, query, "patient_name", ASCENDING, limit, cursor)
+    return typed_response(Page[VitalsAlert], {"items": alerts, "next_cursor": next_cursor})
+
+# ==================== CLINICAL NOTES SEARCH ====================
+# Free-text fields of visits, interventions and incident reports are copied into
+# clinical_notes, one document per source record, when the record is written.
+# A single text index over fields.text serves ranked search across all three;
+# snippets and highlight offsets are cut from the stored text in process.
+# index_clinical_notes / unindex_clinical_notes / search_clinical_notes are the
+# only entry points, so the backing index can change without touching callers.
+NOTE_FIELDS = {
+    "visit": [
+        "nurse_notes",
+        "daily_note_content",
+        "changes_since_last.medication_changes",
+        "changes_since_last.diagnosis_changes",
+        "changes_since_last.er_urgent_care_visits",
+        "changes_since_last.upcoming_appointments",
+        "home_visit_logbook.notes",
+    ],
+    "intervention": [
+        "additional_comments",
+        "notes",
+        "test_details.notes",
+        "treatment_details.notes",
+        "procedure_details.notes",
+    ],
+    "incident_report": [
+        "description",
+        "outcome",
+        "additional_info",
+        "location",
+        "witnesses",
+        "others_notified",
+    ],
+}
+NOTE_DATE_FIELDS = {"visit": "visit_date", "intervention": "intervention_date", "incident_report": "incident_date"}
+NOTE_SOURCE_COLLECTIONS = {"visit": "visits", "intervention": "interventions", "incident_report": "incident_reports"}
+SNIPPET_CHARS = 160
+SEARCH_SUFFIXES = ("ing", "es", "ed", "s")
+
+def dotted_get(doc: dict, path: str):
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+def note_patient_ids(source: str, record: dict) -> List[str]:
+    if source == "incident_report":
+        return [p for p in record.get("involved_residents") or [] if isinstance(p, str)]
+    return [record["patient_id"]]
+
+def note_doc(source: str, record: dict, patient_organizations: dict) -> Optional[dict]:
+    """The clinical_notes document for a source record, or None when it has nothing to index"""
+    if source == "visit" and record.get("status", "completed") != "completed":
+        return None
+    fields = [
+        {"field": path, "text": text.strip()}
+        for path in NOTE_FIELDS[source]
+        if isinstance(text := dotted_get(record, path), str) and text.strip()
+    ]
+    if not fields:
+        return None
+    patient_ids = note_patient_ids(source, record)
+    organization = record.get("organization")
+    if not organization and patient_ids:
+        organization = patient_organizations.get(patient_ids[0])
+    try:
+        note_date = to_bson_date(record.get(NOTE_DATE_FIELDS[source]))
+    except ValueError:
+        note_date = None
+    return {
+        "id": f"{source}:{record['id']}",
+        "source": source,
+        "source_id": record["id"],
+        "patient_ids": patient_ids,
+        "organization": organization,
+        "nurse_id": record.get("nurse_id"),
+        "note_date": note_date,
+        "fields": fields
+    }
+
+async def patient_organizations(patient_ids) -> dict:
+    if not patient_ids:
+        return {}
+    return {
+        p["id"]: (p.get("permanent_info") or {}).get("organization")
+        async for p in db.patients.find({"id": {"$in": list(patient_ids)}}, {"_id": 0, "id": 1, "permanent_info.organization": 1})
+    }
+
+async def clinical_note_ops(source: str, records: List[dict]) -> list:
+    organizations = await patient_organizations({p for r in records for p in note_patient_ids(source, r)})
+    ops = []
+    for record in records:
+        doc = note_doc(source, record, organizations)
+        note_id = f"{source}:{record['id']}"
+        ops.append(ReplaceOne({"id": note_id}, doc, upsert=True) if doc else DeleteOne({"id": note_id}))
+    return ops
+
+async def index_clinical_notes(source: str, records: List[dict]):
+    """Upsert (or drop) the notes of source records that were just written"""
+    if records:
+        await db.clinical_notes.bulk_write(await clinical_note_ops(source, records), ordered=False)
+
+async def unindex_clinical_notes(source: str, record_ids: List[str]):
+    if record_ids:
+        await db.clinical_notes.delete_many({"id": {"$in": [f"{source}:{i}" for i in record_ids]}})
+
+async def rebuild_clinical_notes(batch_size: int = 1000) -> int:
+    """Backfill clinical_notes from every visit, intervention and incident report"""
+    written = 0
+    for source, collection in NOTE_SOURCE_COLLECTIONS.items():
+        projection = {"_id": 0, "id": 1, "patient_id": 1, "nurse_id": 1, "status": 1, "organization": 1,
+                      "involved_residents": 1, NOTE_DATE_FIELDS[source]: 1}
+        projection.update({path: 1 for path in NOTE_FIELDS[source]})
+        batch = []
+        async for record in db[collection].find({}, projection).batch_size(batch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                await index_clinical_notes(source, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            await index_clinical_notes(source, batch)
+            written += len(batch)
+    return written
+
+def highlight_terms(q: str) -> List[str]:
+    """Query words (negations dropped) cut back to a rough stem for highlighting"""
+    terms = []
+    for word in re.findall(r"-?\w+", q.lower()):
+        if word.startswith("-"):
+            continue
+        for suffix in SEARCH_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+def word_matches(text: str, terms: List[str]) -> List[Tuple[int, int]]:
+    return [
+        (m.start(), m.end()) for m in re.finditer(r"\w+", text)
+        if any(m.group().lower().startswith(term) for term in terms)
+    ]
+
+def note_snippet(fields: List[dict], terms: List[str]) -> dict:
+    """The field with the most matching words, trimmed to a window around the first match"""
+    best, best_matches = fields[0], []
+    for field in fields:
+        matches = word_matches(field["text"], terms)
+        if len(matches) > len(best_matches):
+            best, best_matches = field, matches
+    text = best["text"]
+    start = 0
+    if best_matches and len(text) > SNIPPET_CHARS:
+        start = max(0, best_matches[0][0] - SNIPPET_CHARS // 4)
+        # Back up to a word boundary
+        while start > 0 and not text[start - 1].isspace():
+            start -= 1
+    end = min(len(text), start + SNIPPET_CHARS)
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    prefix = "…" if start > 0 else ""
+    snippet = prefix + text[start:end] + ("…" if end < len(text) else "")
+    offset = len(prefix) - start
+    return {
+        "field": best["field"],
+        "snippet": snippet,
+        "highlights": [(s + offset, e + offset) for s, e in best_matches if s >= start and e <= end]
+    }
+
+class NoteSearchHit(BaseModel):
+    source: str  # visit, intervention, incident_report
+    source_id: str
+    patient_ids: List[str] = []
+    organization: Optional[str] = None
+    nurse_id: Optional[str] = None
+    note_date: Optional[DateString] = None
+    field: str  # Field the snippet was cut from, e.g. changes_since_last.er_urgent_care_visits
+    snippet: str
+    highlights: List[Tuple[int, int]] = []  # [start, end) character offsets into snippet
+    score: float
+
+def notes_search_query(
+    nurse: dict,
+    patient_ids: Optional[List[str]],
+    q: str,
+    patient_id: Optional[str] = None,
+    organization: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source: Optional[str] = None
+) -> dict:
+    """The $text filter for a notes search; patient_ids is the caller's accessible set, None for admins"""
+    query = {"$text": {"$search": q}}
+    if patient_ids is not None:
+        # Same scoping as the record endpoints: visits and interventions of
+        # accessible patients, incident reports filed by the caller
+        query["$or"] = [
+            {"source": {"$ne": "incident_report"}, "patient_ids": {"$in": patient_ids}},
+            {"source": "incident_report", "nurse_id": nurse["id"]}
+        ]
+    if patient_id:
+        query["patient_ids"] = patient_id
+    if organization:
+        query["organization"] = organization
+    if source:
+        query["source"] = source
+    if start_date or end_date:
+        query["note_date"] = day_range(start_date or "1900-01-01", end_date or "2999-12-31")
+    return query
+
+async def search_clinical_notes(
+    nurse: dict,
+    q: str,
+    patient_id: Optional[str] = None,
+    organization: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: int = 20
+) -> List[dict]:
+    patient_ids = None if nurse.get("is_admin") else list(await accessible_patient_ids(nurse))
+    query = notes_search_query(nurse, patient_ids, q, patient_id, organization, start_date, end_date, source)
+    terms = highlight_terms(q)
+    cursor = db.clinical_notes.find(
+        query, {"_id": 0, "id": 0, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"}), ("note_date", DESCENDING)]).limit(limit)
+    hits = []
+    async for note in cursor:
+        fields = note.pop("fields")
+        hits.append({**note, **note_snippet(fields, terms), "score": round(note["score"], 4)})
+    return hits
+
+@api_router.get("/notes/search", response_model=List[NoteSearchHit])
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=200),
+    patient_id: Optional[str] = None,
+    organization: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source: Optional[str] = Query(None, pattern="^(visit|intervention|incident_report)$"),
+    limit: int = Query(20, ge=1, le=100),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Ranked full-text search over visit notes, intervention comments and incident
+    report narratives. Supports MongoDB text syntax: "quoted phrases" and -exclusions.
+    """
+    if patient_id:
+        await require_patient_access(nurse, patient_id)
+    hits = await search_clinical_notes(nurse, q, patient_id, organization, start_date, end_date, source, limit)
+    return typed_response(List[NoteSearchHit], hits)
+
+@api_router.post("/admin/maintenance/rebuild-notes-index")
+async def rebuild_notes_index(nurse: dict = Depends(get_current_nurse)):
+    """Backfill clinical_notes from every stored visit, intervention and incident report"""
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    written = await rebuild_clinical_notes()
+    return {"message": "Clinical notes index rebuilt", "records_indexed": written}
+
+# ==================== DELTA SYNC ====================
+# Every patient-scoped document carries an ISO updated_at string, and deletions
+# leave a tombstone in deleted_records. The feed pages each collection by
+# (updated_at, id) so clients only download what changed since their watermark.
+SYNC_COLLECTIONS = ["patients", "visits", "unable_to_contact", "interventions", "deleted_records"]
+
+# Gaining or losing a patient changes no updated_at, so the watermark also
+# carries a digest of the caller's accessible patient ids. When it no longer
+# matches, the feed starts over from the beginning with reset=True.
+ADMIN_ACCESS_DIGEST = "*"
+
+# Invariant: every write stamps updated_at at most SYNC_OVERLAP_SECONDS before
+# it commits. The watermark trails the read by that much, so clients may see a
+# record twice but never miss one. Batch jobs (activity summaries, migrations)
+# must therefore take a fresh timestamp per batch, never one per run.
+SYNC_OVERLAP_SECONDS = 5
+
+class SyncChanges(BaseModel):
+    patients: List[PatientResponse] = []
+    visits: List[VisitResponse] = []
+    unable_to_contact: List[UnableToContactResponse] = []
+    interventions: List[InterventionResponse] = []
+    deleted: List[dict] = []  # {collection, id, patient_id, updated_at}
+
+class SyncResponse(BaseModel):
+    watermark: str  # Pass back as ?since= on the next sync
+    reset: bool = False  # Patient access changed: discard local data and apply this as a full sync
+    has_more: bool  # True when any collection was truncated; call again immediately
+    changes: SyncChanges
+
+async def record_deletion(collection: str, record_id: str, patient_id: str):
+    await db.deleted_records.insert_one({
+        "collection": collection,
+        "id": record_id,
+        "patient_id": patient_id,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    })
+
+async def backfill_updated_at():
+    """Give records written before updated_at existed their created_at as a starting point"""
+    for collection in ["visits", "unable_to_contact", "interventions", "patients"]:
+        await db[collection].update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": "$created_at"}}]
+        )
+
+def access_digest(patient_ids: Optional[List[str]]) -> str:
+    if patient_ids is None:
+        return ADMIN_ACCESS_DIGEST
+    return hashlib.sha1("\n".join(sorted(patient_ids)).encode('utf-8')).hexdigest()
+
+def encode_watermark(positions: dict, access: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({**positions, "access": access}).encode('utf-8')).decode('ascii')
+
+def decode_watermark(watermark: Optional[str]) -> Tuple[dict, Optional[str]]:
+    """Per-collection positions and the access digest the watermark was issued for"""
+    if not watermark:
+        return {}, None
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(watermark.encode('ascii')))
+        return {name: tuple(positions[name]) for name in SYNC_COLLECTIONS if name in positions}, positions.get("access")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid watermark")
+
+@api_router.get("/sync/changes", response_model=SyncResponse)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Everything created, updated or deleted since the watermark, for the patients
+    the caller can see. Omit since for a full initial sync.
+    """
+    positions, watermark_access = decode_watermark(since)
+    safe_position = ((datetime.now(timezone.utc) - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat(), "")
+    
+    patient_ids = None if nurse.get("is_admin") else list(await accessible_patient_ids(nurse))
+    access = access_digest(patient_ids)
+    # Watermarks issued before the digest existed also start over once
+    reset = since is not None and watermark_access != access
+    if reset:
+        positions = {}
+    
+    changes = {}
+    new_positions = {}
+    has_more = False
+    for name in SYNC_COLLECTIONS:
+        query = {}
+        if patient_ids is not None:
+            if name == "patients":
+                query = {"id": {"$in": patient_ids}}
+            elif name == "deleted_records":
+                # Patient tombstones carry no clinical data, so every client gets them
+                query = {"$or": [{"collection": "patients"}, {"patient_id": {"$in": patient_ids}}]}
+            else:
+                query = {"patient_id": {"$in": patient_ids}}
+        
+        position = positions.get(name)
+        cursor = encode_cursor(position[0], position[1]) if position else None
+        docs, next_cursor = await fetch_page(db[name], query, "updated_at", ASCENDING, limit, cursor)
+        changes[name] = docs
+        if next_cursor:
+            has_more = True
+            new_positions[name] = [docs[-1]["updated_at"], docs[-1]["id"]]
+        else:
+            new_positions[name] = list(max(position, safe_position) if position else safe_position)
+    
+    return typed_response(SyncResponse, {
+        "watermark": encode_watermark(new_positions, access),
+        "reset": reset,
+        "has_more": has_more,
+        "changes": {
+            "patients": [apply_activity_summary(p, nurse) for p in changes["patients"]],
+            "visits": changes["visits"],
+            "unable_to_contact": changes["unable_to_contact"],
+            "interventions": changes["interventions"],
+            "deleted": changes["deleted_records"]
+        }
+    })
+
+# ==================== DATE MIGRATION ====================
+DATE_FIELDS = [
+    ("visits", "visit_date"),
+    ("unable_to_contact", "attempt_date"),
+    ("interventions", "intervention_date"),
+]
+
+async def migrate_date_field(collection: str, field: str, batch_size: int, max_batches: int) -> dict:
+    """
+    Convert string values of one date field to BSON dates in _id order.
+    Converted documents drop out of the filter, so an interrupted run simply
+    resumes where it stopped. Unparseable values are logged and left as-is.
+    """
+    converted = 0
+    skipped = 0
+    last_id = None
+    for _ in range(max_batches):
+        query = {field: {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = await db[collection].find(query, {"_id": 1, field: 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        ops = []
+        for doc in docs:
+            try:
+                ops.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: to_bson_date(doc[field])}}))
+            except ValueError:
+                skipped += 1
+                logger.warning(f"Unparseable {collection}.{field} on {doc['_id']}: {doc[field]!r}")
+        if ops:
+            result = await db[collection].bulk_write(ops, ordered=False)
+            converted += result.modified_count
+        last_id = docs[-1]["_id"]
+    remaining = await db[collection].count_documents({field: {"$type": "string"}})
+    return {"converted": converted, "skipped": skipped, "remaining": remaining}
+
+@api_router.post("/admin/maintenance/migrate-dates")
+async def migrate_dates(
+    batch_size: int = Query(1000, ge=1, le=10000),
+    max_batches: int = Query(100, ge=1),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Convert stored date strings to BSON dates, at most max_batches batches per
+    field per call. Call again until every field reports remaining == 0; the
+    derived summaries and rollups are rebuilt once nothing is left.
+    """
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    results = {}
+    for collection, field in DATE_FIELDS:
+        results[f"{collection}.{field}"] = await migrate_date_field(collection, field, batch_size, max_batches)
+    
+    complete = all(r["remaining"] == 0 for r in results.values())
+    if complete:
+        await last_visit_version.bump()
+        await refresh_activity_summaries()
+        await rebuild_monthly_rollups()
+        await rebuild_vitals_series()
+        await rebuild_clinical_notes()
+    return {"complete": complete, "fields": results}
+
+# ==================== VISIT COMPACTION MIGRATION ====================
+async def compact_stored_visits(batch_size: int, max_batches: int) -> dict:
+    """
+    Rewrite full-shape visit documents into the compact storage form in _id
+    order. Each write is guarded on the visit's version, so a visit edited
+    mid-run is left for the next call instead of being overwritten.
+    """
+    compacted = 0
+    skipped = 0
+    last_id = None
+    stale = {"schema_version": {"$ne": VISIT_SCHEMA_VERSION}}
+    projection = {"_id": 1, "id": 1, "version": 1, **{field: 1 for field in VisitCreate.model_fields}}
+    for _ in range(max_batches):
+        query = dict(stale)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = await db.visits.find(query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        ops = []
+        for doc in docs:
+            stored = {field: doc[field] for field in VisitCreate.model_fields if field in doc and field != "visit_date"}
+            try:
+                fields = compact_visit_fields(VisitCreate(**stored))
+            except ValidationError as e:
+                skipped += 1
+                logger.warning(f"Visit {doc.get('id')} does not match VisitCreate, left uncompacted: {e}")
+                continue
+            cleared = {field: "" for field in stored if field not in fields}
+            update = {"$set": {**fields, "schema_version": VISIT_SCHEMA_VERSION}}
+            if cleared:
+                update["$unset"] = cleared
+            ops.append(UpdateOne({"_id": doc["_id"], "version": doc.get("version")}, update))
+        if ops:
+            result = await db.visits.bulk_write(ops, ordered=False)
+            compacted += result.modified_count
+        last_id = docs[-1]["_id"]
+    remaining = await db.visits.count_documents(stale)
+    return {"compacted": compacted, "skipped": skipped, "remaining": remaining}
+
+@api_router.post("/admin/maintenance/compact-visits")
+async def compact_visits(
+    batch_size: int = Query(1000, ge=1, le=10000),
+    max_batches: int = Query(100, ge=1),
+    nurse: dict = Depends(get_current_nurse)
+):
+    """
+    Compact visits written before sparse storage, at most max_batches batches
+    per call. Call again until remaining == 0.
+    """
+    if not nurse.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await compact_stored_visits(batch_size, max_batches)
+
 # ==================== DEMO DATA SETUP ====================
 @api_router.get("/setup-demo-data")
 async def setup_demo_data():
@@ -1371,14 +4336,16 @@ async def setup_demo_data():
         ]
         
         for org in organizations:
+            org["created_at"] = datetime.now(timezone.utc).isoformat()
             await db.organizations.insert_one(org)
+        await bump_reference_data_version()
         
         # Create Nurses
         nurses = [
             {
                 "id": str(uuid.uuid4()),
                 "email": "demo@nursemed.com",
-                "password_hash": hash_password("demo123"),
+                "password_hash": await hash_password("demo123"),
                 "full_name": "Demo Admin",
                 "title": "Administrator",
                 "license_number": "ADMIN001",
@@ -1395,7 +4362,7 @@ async def setup_demo_data():
             {
                 "id": str(uuid.uuid4()),
                 "email": "sarah.johnson@nursemed.com",
-                "password_hash": hash_password("nurse123"),
+                "password_hash": await hash_password("nurse123"),
                 "full_name": "Sarah Johnson",
                 "title": "Registered Nurse (RN)",
                 "license_number": "RN123456",
@@ -1412,7 +4379,7 @@ async def setup_demo_data():
             {
                 "id": str(uuid.uuid4()),
                 "email": "michael.chen@nursemed.com",
-                "password_hash": hash_password("nurse123"),
+                "password_hash": await hash_password("nurse123"),
                 "full_name": "Michael Chen",
                 "title": "Licensed Practical Nurse (LPN)",
                 "license_number": "LPN789012",
@@ -1502,7 +4469,10 @@ async def setup_demo_data():
         ]
         
         for patient in patients:
+            patient["clinical_terms"] = clinical_terms(patient["permanent_info"])
             await db.patients.insert_one(patient)
+        await refresh_activity_summaries([patient["id"] for patient in patients])
+        await refresh_patient_search([patient["id"] for patient in patients])
         
         return {
             "message": "Demo data created successfully!",
@@ -1566,6 +4536,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_indexes():
+    await ensure_indexes()
+    await backfill_updated_at()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    global thumbnail_executor
+    if thumbnail_executor is not None:
+        thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        thumbnail_executor = None
     client.close()
+
+if __name__ == "__main__":
+    # python server.py check-query-plans: exits non-zero if any endpoint query shape
+    # is answered by a collection scan (run against a database with indexes applied)
+    import asyncio
+    import sys
+
+    async def _check_query_plans() -> int:
+        await ensure_indexes()
+        failed = 0
+        for result in await verify_query_plans():
+            marker = "COLLSCAN" if result["collscan"] else "ok"
+            print(f"{marker:8} {result['endpoint']:32} {' > '.join(result['stages'])}")
+            failed += result["collscan"]
+        return 1 if failed else 0
+
+    # python server.py scan-vitals: the abnormal-vitals batch job, for cron
+    async def _scan_vitals() -> int:
+        print(await scan_vitals_alerts())
+        return 0
+
+    if sys.argv[1:] == ["check-query-plans"]:
+        sys.exit(asyncio.run(_check_query_plans()))
+    if sys.argv[1:] == ["scan-vitals"]:
+        sys.exit(asyncio.run(_scan_vitals()))
+    print("usage: python server.py check-query-plans | scan-vitals")
+    sys.exit(2)
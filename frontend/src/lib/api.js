@@ -32,6 +32,19 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are cursor-paginated ({ items, next_cursor }); follow the
+// cursors and hand back the full list in the usual { data } shape
+const collectPages = async (url, params = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, { params: { ...params, ...(cursor ? { cursor } : {}) } });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return { data: items };
+};
+
 // Auth API
 export const authAPI = {
   register: (data) => api.post('/auth/register', data),
@@ -41,7 +54,8 @@ export const authAPI = {
 
 // Patients API
 export const patientsAPI = {
-  list: () => api.get('/patients'),
+  list: () => collectPages('/patients'),
+  search: (q, limit = 50) => api.get('/patients/search', { params: { q, limit } }),
   get: (id) => api.get(`/patients/${id}`),
   create: (data) => api.post('/patients', data),
   update: (id, data) => api.put(`/patients/${id}`, data),
@@ -50,17 +64,20 @@ export const patientsAPI = {
 
 // Visits API
 export const visitsAPI = {
-  list: (patientId) => api.get(`/patients/${patientId}/visits`),
+  list: (patientId) => collectPages(`/patients/${patientId}/visits`),
   get: (visitId) => api.get(`/visits/${visitId}`),
   getLast: (patientId) => api.get(`/patients/${patientId}/visits/last`),
+  prefill: (patientId) => api.get(`/patients/${patientId}/visits/prefill`),
   create: (patientId, data) => api.post(`/patients/${patientId}/visits`, data),
+  createBatch: (items) => api.post('/visits/batch', items),
   update: (visitId, data) => api.put(`/visits/${visitId}`, data),
+  patch: (visitId, data) => api.patch(`/visits/${visitId}`, data),
   delete: (visitId) => api.delete(`/visits/${visitId}`),
 };
 
 // Unable to Contact API
 export const unableToContactAPI = {
-  list: (patientId) => api.get(`/patients/${patientId}/unable-to-contact`),
+  list: (patientId) => collectPages(`/patients/${patientId}/unable-to-contact`),
   get: (recordId) => api.get(`/unable-to-contact/${recordId}`),
   create: (data) => api.post('/unable-to-contact', data),
   delete: (recordId) => api.delete(`/unable-to-contact/${recordId}`),
@@ -68,15 +85,80 @@ export const unableToContactAPI = {
 
 // Interventions API
 export const interventionsAPI = {
-  list: (patientId) => api.get(`/patients/${patientId}/interventions`),
+  list: (patientId) => collectPages(`/patients/${patientId}/interventions`),
   get: (interventionId) => api.get(`/interventions/${interventionId}`),
   create: (data) => api.post('/interventions', data),
   delete: (interventionId) => api.delete(`/interventions/${interventionId}`),
 };
 
+// Attachments API
+// Files are sent in ranges of UPLOAD_RANGE_CHUNKS server chunks; after a failed
+// request the upload resumes from the offset the server reports
+const UPLOAD_RANGE_CHUNKS = 16;
+const UPLOAD_RETRIES = 3;
+
+export const attachmentsAPI = {
+  get: (attachmentId) => api.get(`/attachments/${attachmentId}`),
+  contentUrl: (attachmentId) => `${API_BASE}/attachments/${attachmentId}/content`,
+  thumbnailUrl: (attachmentId) => `${API_BASE}/attachments/${attachmentId}/thumbnail`,
+  delete: (attachmentId) => api.delete(`/attachments/${attachmentId}`),
+  upload: async (file, patientId = null) => {
+    const { data } = await api.post('/attachments', {
+      filename: file.name,
+      content_type: file.type || 'application/octet-stream',
+      length: file.size,
+      patient_id: patientId,
+    });
+    let { uploaded } = data;
+    let retries = 0;
+    while (uploaded < file.size) {
+      const end = Math.min(uploaded + data.chunk_size * UPLOAD_RANGE_CHUNKS, file.size);
+      try {
+        const response = await api.put(`/attachments/${data.id}/content`, file.slice(uploaded, end), {
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'Content-Range': `bytes ${uploaded}-${end - 1}/${file.size}`,
+          },
+        });
+        uploaded = response.data.uploaded;
+        retries = 0;
+      } catch (error) {
+        if (++retries > UPLOAD_RETRIES) throw error;
+        uploaded = (await api.get(`/attachments/${data.id}`)).data.uploaded;
+      }
+    }
+    return data.id;
+  },
+  // Upload any File objects in a list and return the list as attachment ids
+  uploadAll: async (files, patientId = null) => {
+    const ids = [];
+    for (const file of files) {
+      ids.push(typeof file === 'string' ? file : await attachmentsAPI.upload(file, patientId));
+    }
+    return ids;
+  },
+};
+
 // Reports API
 export const reportsAPI = {
   getMonthly: (data) => api.post('/reports/monthly', data),
 };
 
+// Clinical notes search API
+// params: patient_id, organization, start_date, end_date, source, limit
+export const notesAPI = {
+  search: (q, params = {}) => api.get('/notes/search', { params: { q, ...params } }),
+};
+
+// Clinical terms API: patients on a medication / with an allergy or diagnosis
+// kind: medication, allergy, diagnosis, psychiatric
+export const clinicalTermsAPI = {
+  patients: (kind, value, params = {}) => api.get('/clinical-terms/patients', { params: { kind, value, ...params } }),
+};
+
+// Admin API
+export const adminAPI = {
+  listNurses: () => collectPages('/admin/nurses'),
+};
+
 export default api;
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
-import { patientsAPI } from '../lib/api';
+import { patientsAPI, adminAPI } from '../lib/api';
 import axios from 'axios';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -98,9 +98,7 @@ export default function AdminPage() {
     try {
       const token = localStorage.getItem('nurse_token');
       const [nursesRes, patientsRes, orgsRes, programsRes] = await Promise.all([
-        axios.get(`${API}/admin/nurses`, {
-          headers: { Authorization: `Bearer ${token}` }
-        }),
+        adminAPI.listNurses(),
         patientsAPI.list(),
         axios.get(`${API}/admin/organizations`, {
           headers: { Authorization: `Bearer ${token}` }
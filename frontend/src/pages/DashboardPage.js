@@ -34,12 +34,15 @@ import {
 } from 'lucide-react';
 import { toast } from 'sonner';
 
+const SEARCH_LIMIT = 50;
+
 export default function DashboardPage() {
   const { nurse, logout } = useAuth();
   const navigate = useNavigate();
   const [patients, setPatients] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
   const [showAddDialog, setShowAddDialog] = useState(false);
   const [newPatientName, setNewPatientName] = useState('');
   const [newPatientOrg, setNewPatientOrg] = useState('');
@@ -72,6 +75,24 @@ export default function DashboardPage() {
     }
   };
 
+  // Search runs on the server (prefix and typo tolerant) once typing pauses
+  useEffect(() => {
+    const q = searchQuery.trim();
+    if (!q) {
+      setSearchResults(null);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const response = await patientsAPI.search(q, SEARCH_LIMIT);
+        setSearchResults(response.data);
+      } catch (error) {
+        toast.error('Failed to search patients');
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
   const handleAddPatient = async (e) => {
     e.preventDefault();
     if (!newPatientName.trim() || !newPatientOrg) {
@@ -98,9 +119,12 @@ export default function DashboardPage() {
     }
   };
 
-  const filteredPatients = patients.filter(p => 
-    p.full_name.toLowerCase().includes(searchQuery.toLowerCase())
-  );
+  const searching = Boolean(searchQuery.trim() && searchResults);
+  const filteredPatients = searching ? searchResults : patients;
+  // The list shows every patient; search only covers the ones this nurse can open
+  const searchScopeNote = nurse?.is_admin
+    ? `Showing the best ${SEARCH_LIMIT} matches`
+    : `Showing the best ${SEARCH_LIMIT} matches among patients you can open`;
 
   const handleLogout = () => {
     logout();
@@ -274,11 +298,17 @@ export default function DashboardPage() {
             </h3>
             <p className="empty-state-description">
               {searchQuery 
-                ? 'Try adjusting your search terms'
+                ? (nurse?.is_admin ? 'Try adjusting your search terms' : 'Search only covers patients you can open. Try adjusting your search terms')
                 : 'Add your first patient to get started with documentation'}
             </p>
           </div>
         ) : (
+          <>
+          {searching && (
+            <p className="text-sm text-slate-500 mb-4" data-testid="search-scope-note">
+              {searchScopeNote}
+            </p>
+          )}
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {filteredPatients.map(patient => {
               const canAccess = nurse?.is_admin || patient.is_assigned_to_me;
@@ -450,6 +480,7 @@ export default function DashboardPage() {
               );
             })}
           </div>
+          </>
         )}
       </main>
     </div>
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
-import { patientsAPI } from '../lib/api';
+import { patientsAPI, adminAPI, attachmentsAPI } from '../lib/api';
 import axios from 'axios';
 import jsPDF from 'jspdf';
 import { Button } from '../components/ui/button';
@@ -86,10 +86,7 @@ export default function IncidentReportPage() {
       setPatients(patientsRes.data);
 
       // Fetch all staff
-      const token = localStorage.getItem('nurse_token');
-      const staffRes = await axios.get(`${API}/admin/nurses`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const staffRes = await adminAPI.listNurses();
       setStaff(staffRes.data);
     } catch (error) {
       console.error('Failed to load data');
@@ -276,7 +273,8 @@ export default function IncidentReportPage() {
 
     try {
       const token = localStorage.getItem('nurse_token');
-      await axios.post(`${API}/incident-reports`, formData, {
+      const attachments = await attachmentsAPI.uploadAll(formData.attachments);
+      await axios.post(`${API}/incident-reports`, { ...formData, attachments }, {
         headers: { Authorization: `Bearer ${token}` }
       });
       
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
-import { patientsAPI, visitsAPI } from '../lib/api';
+import { patientsAPI, visitsAPI, attachmentsAPI } from '../lib/api';
 import { isBloodPressureAbnormal } from '../lib/utils';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -275,13 +275,14 @@ export default function NewVisitPage() {
         organization: patientOrg
       }));
       
-      // Load last visit for "pull from last" functionality
+      // Load the carry-forward fields of the last visit for "pull from last" functionality
       try {
-        const lastVisitResponse = await visitsAPI.getLast(patientId);
-        setLastVisit(lastVisitResponse.data);
+        const prefillResponse = await visitsAPI.prefill(patientId);
+        if (prefillResponse.data.last_visit_id) {
+          setLastVisit(prefillResponse.data);
+        }
       } catch (err) {
-        // No previous visit - that's okay
-        console.log('No previous visits found');
+        console.log('Failed to load last visit fields');
       }
       
       // Pre-fill height from last vitals (height should persist)
@@ -393,6 +394,7 @@ export default function NewVisitPage() {
     
     try {
       let submitData = { ...visitData, status: saveAs };
+      submitData.attachments = await attachmentsAPI.uploadAll(visitData.attachments, patientId);
       
       // Auto-append initials for daily notes
       if (visitType === 'daily_note' && submitData.daily_note_content) {
@@ -79,6 +79,7 @@ export default function ReportsPage() {
         year: parseInt(selectedYear),
         month: parseInt(selectedMonth),
         visit_type: selectedVisitType, // Always include visit type
+        include_visits: true, // The report tables and PDF list every visit
       };
       
       if (selectedPatient !== 'all') {
@@ -0,0 +1,32 @@
+"""Scratch databases for the tests that need a real MongoDB server"""
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+import server
+
+
+@asynccontextmanager
+async def scratch_database(monkeypatch, prefix: str):
+    """
+    Point server.db at a fresh database with INDEX_MANIFEST applied and drop it
+    on exit. Skips the calling test when no MongoDB is reachable at MONGO_URL.
+    """
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=2000, tz_aware=True)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB not reachable at MONGO_URL: {e}")
+    name = f"{prefix}_{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(server, "db", client[name])
+    try:
+        await server.ensure_indexes()
+        yield client[name]
+    finally:
+        await client.drop_database(name)
+        client.close()
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import HTTPException
+
+from server import parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (" bytes=0-0 ", (0, 0)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=-", "bytes=0-10,20-30", "items=0-10", "bytes=abc-"])
+def test_parse_range_serves_the_full_file(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, length", [("bytes=1000-", 1000), ("bytes=50-10", 1000), ("bytes=0-", 0)])
+def test_parse_range_not_satisfiable(header, length):
+    with pytest.raises(HTTPException) as exc:
+        parse_range(header, length)
+    assert exc.value.status_code == 416
+    assert exc.value.headers == {"Content-Range": f"bytes */{length}"}
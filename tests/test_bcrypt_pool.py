@@ -0,0 +1,86 @@
+"""
+Load test for the bcrypt pool: 50 concurrent password checks must not stall
+the event loop, and calls past BCRYPT_MAX_PENDING must fail fast with a 503.
+"""
+import asyncio
+import time
+
+import bcrypt
+import httpx
+from fastapi import HTTPException
+
+import server
+
+CONCURRENT_LOGINS = 50
+HASHED = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(rounds=8)).decode()
+
+
+def p99(samples):
+    ordered = sorted(samples)
+    return ordered[int(0.99 * (len(ordered) - 1))]
+
+
+async def unrelated_latencies(client: httpx.AsyncClient, until: asyncio.Future) -> list:
+    """
+    Latency of GET /api/ (no database, no bcrypt) for every request that
+    completed while `until` was still running
+    """
+    latencies = []
+    while not until.done():
+        start = time.perf_counter()
+        response = await client.get("/api/")
+        if not until.done():
+            latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+        await asyncio.sleep(0.002)
+    return latencies
+
+
+async def measure(logins: int) -> tuple:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        if logins:
+            load = asyncio.ensure_future(asyncio.gather(*[
+                server.verify_password("correct horse", HASHED) for _ in range(logins)
+            ]))
+        else:
+            load = asyncio.ensure_future(asyncio.sleep(0.3))  # Idle baseline
+        latencies = await unrelated_latencies(client, load)
+        return await load, latencies
+
+
+def test_unrelated_p99_stays_flat_during_concurrent_logins(monkeypatch):
+    monkeypatch.setattr(server, "BCRYPT_MAX_PENDING", CONCURRENT_LOGINS)
+    started = time.perf_counter()
+    server._verify_password_sync("correct horse", HASHED)
+    one_check = time.perf_counter() - started
+    _, idle = asyncio.run(measure(0))
+    started = time.perf_counter()
+    results, loaded = asyncio.run(measure(CONCURRENT_LOGINS))
+    elapsed = time.perf_counter() - started
+
+    assert results == [True] * CONCURRENT_LOGINS
+    # The checks ran on BCRYPT_WORKERS threads: the loop kept serving while they ran
+    assert len(loaded) >= 20
+    print(f"\none check {one_check * 1000:.1f} ms, idle p99 {p99(idle) * 1000:.1f} ms, "
+          f"p99 during {CONCURRENT_LOGINS} logins {p99(loaded) * 1000:.1f} ms ({elapsed:.2f} s for the logins)")
+    # Checks run on the loop would hold requests behind them for at least one_check
+    # each; on the pool only thread scheduling adds to the idle latency
+    assert p99(loaded) < p99(idle) + one_check
+
+
+def test_calls_past_max_pending_get_503(monkeypatch):
+    monkeypatch.setattr(server, "BCRYPT_MAX_PENDING", 8)
+
+    async def burst():
+        return await asyncio.gather(
+            *[server.verify_password("correct horse", HASHED) for _ in range(CONCURRENT_LOGINS)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert results.count(True) == 8
+    assert len(rejected) == CONCURRENT_LOGINS - 8
+    assert all(r.status_code == 503 and r.headers == {"Retry-After": "1"} for r in rejected)
+    assert server._bcrypt_pending == 0
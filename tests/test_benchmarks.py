@@ -0,0 +1,223 @@
+"""
+Benchmarks behind the performance changes. The numbers are printed; run with
+`python -m pytest -s tests/test_benchmarks.py` to see them. The assertions
+only guard against the regressions each change removed. Benchmarks that need
+a database use a scratch one on MONGO_URL and are skipped when none is reachable.
+"""
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import bson
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import server
+from tests.mongo import scratch_database
+
+BENCH_NURSE = {
+    "id": "bench-nurse", "email": "bench@example.com", "full_name": "Bench Nurse", "title": "RN",
+    "is_admin": True, "created_at": "2024-01-01T00:00:00+00:00"
+}
+
+
+def timed(samples: list) -> str:
+    ordered = sorted(samples)
+    return (f"p50 {statistics.median(ordered) * 1000:7.1f} ms  "
+            f"p95 {ordered[int(0.95 * (len(ordered) - 1))] * 1000:7.1f} ms")
+
+
+# ---- user-001: list_patients at 100, 1k and 10k patients ----
+PATIENT_COUNTS = [100, 1000, 10000]
+LIST_PATIENTS_RUNS = 20
+
+
+async def seed_patients(db, start: int, stop: int):
+    """Patients start..stop-1, each with one completed visit and every third with a UTC record"""
+    now = datetime.now(timezone.utc)
+    patients, visits, records = [], [], []
+    for i in range(start, stop):
+        patient_id = f"patient-{i:05d}"
+        patients.append({
+            "id": patient_id,
+            "full_name": f"Patient {i:05d}",
+            "permanent_info": {"organization": f"org-{i % 20}", "visit_frequency": "Monthly"},
+            "nurse_id": BENCH_NURSE["id"],
+            "assigned_nurses": [BENCH_NURSE["id"]],
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
+        })
+        visits.append({
+            "id": f"visit-{i:05d}", "patient_id": patient_id, "nurse_id": BENCH_NURSE["id"],
+            "visit_date": now - timedelta(days=i % 40), "visit_type": "nurse_visit", "status": "completed",
+            "vital_signs": {"weight": "150", "blood_pressure_systolic": "120", "blood_pressure_diastolic": "80"},
+            "created_at": now.isoformat(), "updated_at": now.isoformat()
+        })
+        if i % 3 == 0:
+            records.append({
+                "id": f"utc-{i:05d}", "patient_id": patient_id, "nurse_id": BENCH_NURSE["id"],
+                "attempt_date": now - timedelta(days=i % 10), "individual_location": "admitted",
+                "created_at": now.isoformat(), "updated_at": now.isoformat()
+            })
+    await db.patients.insert_many(patients)
+    await db.visits.insert_many(visits)
+    if records:
+        await db.unable_to_contact.insert_many(records)
+    await server.refresh_activity_summaries([p["id"] for p in patients])
+
+
+async def bench_list_patients(monkeypatch) -> dict:
+    results = {}
+    async with scratch_database(monkeypatch, "bench_list_patients") as db:
+        await db.nurses.insert_one(dict(BENCH_NURSE))
+        headers = {"Authorization": f"Bearer {server.create_token(BENCH_NURSE['id'])}"}
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            seeded = 0
+            for count in PATIENT_COUNTS:
+                await seed_patients(db, seeded, count)
+                seeded = count
+                first_page = []
+                for _ in range(LIST_PATIENTS_RUNS):
+                    started = time.perf_counter()
+                    response = await client.get("/api/patients", params={"limit": server.MAX_PAGE_SIZE})
+                    first_page.append(time.perf_counter() - started)
+                    assert response.status_code == 200
+                started = time.perf_counter()
+                listed, cursor = 0, None
+                while True:
+                    params = {"limit": server.MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+                    page = (await client.get("/api/patients", params=params)).json()
+                    listed += len(page["items"])
+                    cursor = page["next_cursor"]
+                    if not cursor:
+                        break
+                assert listed == count
+                assert page["items"][-1]["last_visit_date"] is not None
+                results[count] = (first_page, time.perf_counter() - started)
+    return results
+
+
+def test_list_patients_latency(monkeypatch):
+    results = asyncio.run(bench_list_patients(monkeypatch))
+    print(f"\nGET /api/patients?limit={server.MAX_PAGE_SIZE}")
+    for count, (first_page, walk) in results.items():
+        print(f"  {count:6d} patients  first page {timed(first_page)}  all pages {walk * 1000:8.1f} ms")
+    # Enrichment is read from the stored activity summary: a full page costs
+    # the same no matter how many patients (and visits) exist in total
+    largest, smaller = PATIENT_COUNTS[-1], PATIENT_COUNTS[-2]
+    assert statistics.median(results[largest][0]) < 2 * statistics.median(results[smaller][0]) + 0.02
+
+
+# ---- user-014: stored visit size by visit type ----
+SAMPLE_VISITS = {
+    "vitals_only": {
+        "visit_type": "vitals_only", "organization": "org-1",
+        "vital_signs": {"weight": "152", "blood_pressure_systolic": "128", "blood_pressure_diastolic": "82",
+                        "pulse": "74", "pulse_oximeter": "97", "body_temperature": "98.4"}
+    },
+    "daily_note": {
+        "visit_type": "daily_note", "organization": "org-1",
+        "daily_note_content": "Resident attended day program, ate well, no behaviours noted. Slept through the night."
+    },
+    "nurse_visit": {
+        "visit_type": "nurse_visit", "organization": "org-1",
+        "vital_signs": {"height": "5'6\"", "weight": "152", "blood_pressure_systolic": "128",
+                        "blood_pressure_diastolic": "82", "pulse": "74", "respirations": "16"},
+        "physical_assessment": {"general_appearance": "Well groomed", "skin_assessment": "Intact, dry",
+                                "mobility_level": "ambulatory", "alert_oriented_level": "4"},
+        "head_to_toe": {"head_neck": "WNL", "eyes_vision": {"glasses": True}},
+        "changes_since_last": {"medication_changes": "Metformin increased to 1000 mg BID"},
+        "home_visit_logbook": {"mar_reviewed": True, "locked_meds_checked": True},
+        "overall_health_status": "stable",
+        "nurse_notes": "Reviewed medication changes with staff."
+    },
+}
+
+
+def full_shape_visit(data: "server.VisitCreate", now: str) -> dict:
+    """The visit document as it was stored before compaction: every field of every section"""
+    return {
+        "id": "visit-1", "patient_id": "patient-1", "nurse_id": BENCH_NURSE["id"],
+        "visit_date": server.to_bson_date(data.visit_date or now),
+        **data.model_dump(exclude={"visit_date"}),
+        "created_at": now, "updated_at": now
+    }
+
+
+def test_compact_visit_size():
+    now = "2024-05-01T12:00:00+00:00"
+    print("\nStored visit size (BSON bytes)")
+    for visit_type, body in SAMPLE_VISITS.items():
+        data = server.VisitCreate(visit_date="2024-05-01", **body)
+        full_doc = full_shape_visit(data, now)
+        compact_doc = server.build_visit_doc("patient-1", data, BENCH_NURSE["id"], now)
+        full, compact = len(bson.encode(full_doc)), len(bson.encode(compact_doc))
+        print(f"  {visit_type:12}  full {full:6d}  compact {compact:6d}  {full / compact:4.1f}x smaller")
+        assert compact * 2 < full
+        # Nothing is lost: the response rehydrated from the compact form is the same
+        ignored = {"id", "schema_version", "version"}
+        assert server.VisitResponse(**compact_doc).model_dump(exclude=ignored) == \
+            server.VisitResponse(**full_doc).model_dump(exclude=ignored)
+
+
+# ---- user-015: response encoding for list_visits and get_monthly_report ----
+ENCODED_VISITS = 1000
+ENCODING_RUNS = 5
+
+
+def stored_visits(count: int) -> list:
+    now = "2024-05-01T12:00:00+00:00"
+    bodies = list(SAMPLE_VISITS.values())
+    visits = []
+    for i in range(count):
+        data = server.VisitCreate(visit_date=f"2024-05-{i % 28 + 1:02d}", **bodies[i % len(bodies)])
+        visits.append(server.build_visit_doc(f"patient-{i % 50:05d}", data, BENCH_NURSE["id"], now))
+    return visits
+
+
+async def fastapi_default_body(response_type, content) -> bytes:
+    """What a route returning `content` used to cost: response_model validation, jsonable_encoder, json.dumps"""
+    field = create_response_field(name="response", type_=response_type) if response_type else None
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+def best_of(func) -> tuple:
+    samples, result = [], None
+    for _ in range(ENCODING_RUNS):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return min(samples), result
+
+
+def test_list_visits_encoding():
+    visits = stored_visits(ENCODED_VISITS)
+    page_type = server.Page[server.VisitResponse]
+    before, old_body = best_of(lambda: asyncio.run(fastapi_default_body(
+        page_type, {"items": [server.VisitResponse(**v) for v in visits], "next_cursor": None}
+    )))
+    after, new_body = best_of(lambda: server.typed_response(page_type, {"items": visits, "next_cursor": None}).body)
+    print(f"\nlist_visits, {ENCODED_VISITS} visits: before {before * 1000:6.1f} ms  after {after * 1000:6.1f} ms  "
+          f"({before / after:.1f}x)")
+    assert json.loads(new_body) == json.loads(old_body)
+    assert after < before
+
+
+def test_monthly_report_encoding():
+    visits = [server.expand_visit(v) for v in stored_visits(ENCODED_VISITS)]
+    for visit in visits:
+        visit["visit_date"] = server.from_bson_date(visit["visit_date"])
+        visit["patient_name"] = "Patient"
+    visits_by_type = {visit_type: [v for v in visits if v["visit_type"] == visit_type] for visit_type in server.REPORT_VISIT_TYPES}
+    report = {"summary": {"period": "2024-05", "total_visits": len(visits)}, "visits": visits, "visits_by_type": visits_by_type}
+    before, old_body = best_of(lambda: asyncio.run(fastapi_default_body(None, report)))
+    after, new_body = best_of(lambda: server.FastJSONResponse(report).body)
+    print(f"\nget_monthly_report, {ENCODED_VISITS} visits: before {before * 1000:6.1f} ms  after {after * 1000:6.1f} ms  "
+          f"({before / after:.1f}x)")
+    assert json.loads(new_body) == json.loads(old_body)
+    assert after < before
@@ -0,0 +1,45 @@
+"""
+Every endpoint query shape must be answered by an index. Runs explain() against
+a scratch database on the MongoDB at MONGO_URL and is skipped when none is
+reachable.
+"""
+import asyncio
+
+import pytest
+
+import server
+from tests.mongo import scratch_database
+
+SHAPE_NAMES = [name for name, _, _, _ in server.query_shapes()]
+
+
+async def _explain_all(monkeypatch) -> dict:
+    async with scratch_database(monkeypatch, "test_query_plans"):
+        return {result["endpoint"]: result for result in await server.verify_query_plans()}
+
+
+@pytest.fixture(scope="module")
+def plans():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield asyncio.run(_explain_all(monkeypatch))
+
+
+def test_shape_names_are_unique():
+    assert len(SHAPE_NAMES) == len(set(SHAPE_NAMES))
+
+
+def test_access_scoped_shapes_come_from_the_builders():
+    nurse = {"id": "n1", "assigned_patients": ["p1"], "assigned_organizations": ["o1"]}
+    access = server.accessible_patient_query(nurse)
+    assert set(access) == {"$or"}
+    assert server.accessible_patient_query({"id": "a1", "is_admin": True}) == {}
+    shapes = {name: query for name, _, query, _ in server.query_shapes()}
+    assert "$or" in shapes["accessible_patient_ids"]
+    assert "$text" in shapes["search_notes"]
+    assert shapes["get_visit_prefill"] == server.completed_visits_query("x")
+
+
+@pytest.mark.parametrize("endpoint", SHAPE_NAMES)
+def test_query_shape_uses_an_index(plans, endpoint):
+    result = plans[endpoint]
+    assert not result["collscan"], f"{endpoint} on {result['collection']}: {' > '.join(result['stages'])}"
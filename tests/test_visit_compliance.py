@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from server import add_interval, compute_next_due, parse_visit_frequency
+
+
+def utc(year, month, day):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def absence(attempt_date, location="admitted", expected_return_date=None):
+    return {"attempt_date": attempt_date, "individual_location": location, "expected_return_date": expected_return_date}
+
+
+@pytest.mark.parametrize("frequency, interval", [
+    ("Weekly", (7, 0)),
+    ("  Bi-Weekly ", (14, 0)),
+    ("monthly", (0, 1)),
+    ("Quarterly", (0, 3)),
+    ("every 3 weeks", (21, 0)),
+    ("Every  1 week", (7, 0)),
+    ("every 10 days", (10, 0)),
+    ("every 2 months", (0, 2)),
+])
+def test_parse_visit_frequency(frequency, interval):
+    assert parse_visit_frequency(frequency) == interval
+
+
+@pytest.mark.parametrize("frequency", [None, "", "As needed", "every 3 years"])
+def test_parse_visit_frequency_unrecognised(frequency):
+    assert parse_visit_frequency(frequency) is None
+
+
+@pytest.mark.parametrize("day, interval, expected", [
+    (utc(2024, 1, 31), (0, 1), utc(2024, 2, 29)),
+    (utc(2023, 1, 31), (0, 1), utc(2023, 2, 28)),
+    (utc(2024, 3, 31), (0, 1), utc(2024, 4, 30)),
+    (utc(2023, 11, 30), (0, 3), utc(2024, 2, 29)),
+    (utc(2023, 12, 15), (0, 1), utc(2024, 1, 15)),
+    (utc(2024, 2, 26), (7, 0), utc(2024, 3, 4)),
+])
+def test_add_interval_clamps_to_month_end(day, interval, expected):
+    assert add_interval(day, interval) == expected
+
+
+def test_compute_next_due_scheduled():
+    assert compute_next_due("Monthly", "2024-01-31", []) == (utc(2024, 2, 29), "scheduled")
+    assert compute_next_due("every 2 weeks", "2024-03-01T15:30:00+00:00", []) == (utc(2024, 3, 15), "scheduled")
+
+
+@pytest.mark.parametrize("frequency, anchor", [("As needed", "2024-03-01"), ("Weekly", None), ("Weekly", "not a date")])
+def test_compute_next_due_unscheduled(frequency, anchor):
+    assert compute_next_due(frequency, anchor, []) == (None, "unscheduled")
+
+
+def test_compute_next_due_pushes_back_by_absences():
+    absences = [absence("2024-03-02", expected_return_date="2024-03-06")]
+    assert compute_next_due("Weekly", "2024-03-01", absences) == (utc(2024, 3, 12), "scheduled")
+
+
+def test_compute_next_due_merges_overlapping_absences():
+    absences = [
+        absence("2024-03-05", "moved_temporarily", "2024-03-12"),
+        absence("2024-03-02", expected_return_date="2024-03-10"),
+        # Entirely inside the first absence
+        absence("2024-03-03", expected_return_date="2024-03-04"),
+    ]
+    # Mar 2 - Mar 12 is 10 paused days, not 8 + 7 + 1
+    assert compute_next_due("Weekly", "2024-03-01", absences) == (utc(2024, 3, 18), "scheduled")
+
+
+def test_compute_next_due_ignores_absences_before_the_anchor():
+    absences = [absence("2024-02-20", expected_return_date="2024-03-05"), absence("2024-02-25", "deceased")]
+    assert compute_next_due("Weekly", "2024-03-01", absences) == (utc(2024, 3, 8), "scheduled")
+
+
+def test_compute_next_due_skips_undated_absences():
+    assert compute_next_due("Weekly", "2024-03-01", [{"individual_location": "deceased"}]) == (utc(2024, 3, 8), "scheduled")
+
+
+def test_compute_next_due_paused_without_return_date():
+    absences = [absence("2024-03-02", expected_return_date="2024-03-04"), absence("2024-03-05")]
+    assert compute_next_due("Weekly", "2024-03-01", absences) == (None, "paused")
+
+
+@pytest.mark.parametrize("location", ["moved_permanently", "deceased"])
+def test_compute_next_due_inactive(location):
+    assert compute_next_due("Weekly", "2024-03-01", [absence("2024-03-03", location)]) == (None, "inactive")
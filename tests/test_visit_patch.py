@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+from server import VisitPatch, apply_dotted_updates, visit_patch_updates
+
+
+def test_section_keys_become_dotted_paths():
+    updates, cleared = visit_patch_updates(VisitPatch(version=3, vital_signs={"weight": "150", "pulse": "72"}))
+    assert updates == {"vital_signs.weight": "150", "vital_signs.pulse": "72"}
+    assert cleared == []
+
+
+def test_section_keys_cleared_to_empty_or_default_are_unset():
+    updates, cleared = visit_patch_updates(VisitPatch(version=3, vital_signs={"weight": "", "bp_abnormal": False, "pulse": "72"}))
+    assert updates == {"vital_signs.pulse": "72"}
+    assert sorted(cleared) == ["vital_signs.bp_abnormal", "vital_signs.weight"]
+
+
+def test_null_section_and_required_fields_are_left_unchanged():
+    updates, cleared = visit_patch_updates(VisitPatch(version=3, vital_signs=None, visit_date=None, status=None))
+    assert updates == {} and cleared == []
+
+
+def test_top_level_fields():
+    updates, cleared = visit_patch_updates(VisitPatch(version=3, visit_date="2024-03-01", nurse_notes="", organization=None))
+    assert updates == {"visit_date": datetime(2024, 3, 1, tzinfo=timezone.utc), "organization": None}
+    assert cleared == ["nurse_notes"]
+
+
+def test_unsent_fields_are_not_touched():
+    updates, cleared = visit_patch_updates(VisitPatch(version=3))
+    assert updates == {} and cleared == []
+
+
+def test_apply_dotted_updates():
+    doc = {"vital_signs": {"weight": "150", "pulse": "72"}, "nurse_notes": "stable", "head_to_toe": "legacy"}
+    result = apply_dotted_updates(
+        doc,
+        {"vital_signs.weight": "148", "physical_assessment.general_appearance": "alert", "head_to_toe.skin": "intact"},
+        ["vital_signs.pulse", "nurse_notes", "endocrine.blood_sugar"]
+    )
+    assert result is doc
+    assert doc == {
+        "vital_signs": {"weight": "148"},
+        "physical_assessment": {"general_appearance": "alert"},
+        "head_to_toe": {"skin": "intact"}
+    }